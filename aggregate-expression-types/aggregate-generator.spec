@@ -1,9 +1,10 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
 
 a = Analysis(
     ['aggregate_expression_types/main.py'],
-    pathex=['/home/codedmart/.cache/pypoetry/virtualenvs/aggregate-expression-types-e5EsB3gb-py3.12/lib/python3.12/site-packages'],
+    pathex=['/home/codedmart/.cache/pypoetry/virtualenvs/aggregate-expression-types-e5EsB3gb-py3.12/lib/python3.12/site-packages', os.path.join(SPECPATH, '..', 'hml-common')],
     binaries=[],
     datas=[('aggregate_expression_types', 'aggregate_expression_types')],
     hiddenimports=['ruamel.yaml', 'ruamel.yaml.constructor', 'ruamel.yaml.representer', 'ruamel.yaml.resolver'],
@@ -1,38 +1,233 @@
 import io
+import os
+import re
+import sys
+import shutil
+import uuid
 import logging
 import argparse
-from typing import List, Dict, Any, Tuple
-from ruamel.yaml import YAML
-import re
-
-yaml = YAML()
-yaml.default_flow_style = False
-yaml.preserve_quotes = True
-yaml.indent(mapping=2, sequence=4, offset=2)
-yaml.preserve_null = True
-yaml.width = 4096
-yaml.representer.add_representer(type(None), lambda self, data: self.represent_scalar('tag:yaml.org,2002:null', 'null'))
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Iterator
+from hml_common.parse_cache import ParseCache, DEFAULT_MAX_CACHE_BYTES
+from hml_common.lazy_yaml import LazyYAML
+from hml_common.metrics import RunMetrics
+from aggregate_expression_types import __version__
+from hml_common.fast_emitter import emit_document
+from hml_common.document_splitter import iter_documents, mapped_file, mapping_loader
+from hml_common.metadata_index import MetadataIndex
+from hml_common.lazy_documents import RawDocument, load_documents
+from hml_common.project_walker import ProjectWalker, DEFAULT_EXCLUDE, split_patterns
+
+def create_round_trip_yaml():
+    from ruamel.yaml import YAML
+    yaml = YAML()
+    yaml.default_flow_style = False
+    yaml.preserve_quotes = True
+    yaml.indent(mapping=2, sequence=4, offset=2)
+    yaml.preserve_null = True
+    yaml.width = 4096
+    yaml.representer.add_representer(type(None), lambda self, data: self.represent_scalar('tag:yaml.org,2002:null', 'null'))
+    return yaml
+
+def create_read_only_yaml():
+    from hml_common.fast_loader import create_fast_yaml
+    return create_fast_yaml()
+
+# ruamel.yaml is only imported once a file is actually loaded or dumped, so the CLI starts quickly
+yaml = LazyYAML(create_round_trip_yaml)
+
+# Loader for files that are read but never rewritten, such as the data connector link
+fast_yaml = LazyYAML(create_read_only_yaml)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def parse_hml_file(file_path: str) -> List[Dict[str, Any]]:
+# Stage timings and I/O counters of the run, including files written versus skipped as unchanged; written out with --metrics
+metrics = RunMetrics('aggregate-expression-types')
+
+# Top-level `kind: Model` line; files without one are skipped before they are parsed
+MODEL_KIND_PATTERN = re.compile(rb'^kind:\s*["\']?Model["\']?\s*(?:#.*)?$', re.MULTILINE)
+
+# Kinds parsed with --lazy-load; documents of any other kind stay raw text and are written back unchanged
+LOADED_KINDS = frozenset(('ObjectType', 'Model', 'Connector', 'DataConnectorScalarRepresentation', 'DataConnectorLink', 'ScalarType', 'GraphqlConfig'))
+
+# Whitespace-only lines at the end of a document; the writers put one blank line before every separator
+TRAILING_BLANK_LINES = re.compile(r'\n[ \t\r\n]*\Z')
+
+def write_if_changed(file_path: str, content: str) -> bool:
+    """
+    Atomically replace file_path with content, leaving the file (and its mtime) untouched when
+    the bytes on disk already match. Returns True if the file was written.
+    """
+    try:
+        with open(file_path, 'r', newline='') as f:
+            if f.read() == content.replace('\n', os.linesep):
+                metrics.count('files_unchanged')
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    directory, basename = os.path.split(os.path.abspath(file_path))
+    tmp_path = os.path.join(directory, f".{basename}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), 'w') as f:
+            f.write(content)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    metrics.count('files_written')
+    metrics.count('bytes_written', len(content.encode('utf-8')))
+    return True
+
+def fast_load_document(doc: str) -> Any:
+    """
+    Load a read-only document with the fast loader, streaming only the needed sections out of DataConnectorLinks.
+    """
+    from hml_common.connector_schema import extract_data_connector_link, is_data_connector_link
+    if is_data_connector_link(doc):
+        try:
+            link = extract_data_connector_link(doc)
+            if link is not None:
+                return link
+        except Exception as e:
+            logging.debug(f"Streaming DataConnectorLink extraction failed, loading the whole document: {str(e)}")
+    return fast_yaml.load(doc)
+
+def trimmed_documents(documents: Iterable[str]) -> Iterator[str]:
+    """
+    The non-empty documents without the blank lines before their separator. The round-trip loader would
+    keep those lines and the writers add one before every separator, so without trimming a file would
+    grow by a blank line per document on every run and never be left unchanged.
+    """
+    return (TRAILING_BLANK_LINES.sub('\n', doc) for doc in documents if doc.strip())
+
+def load_lazily(documents: Iterable[str], load: Callable[[str], Any]) -> List[Any]:
+    """
+    Load the trimmed documents of LOADED_KINDS and keep the others as RawDocuments.
+    """
+    return load_documents(trimmed_documents(documents), load, LOADED_KINDS)
+
+def parse_hml_file(file_path: str, cache: Optional[ParseCache] = None, fast: bool = False, run_metrics: Optional[RunMetrics] = None, lazy: bool = False) -> List[Any]:
     """
     Parse an HML file and return its contents as a list of YAML documents.
+    Unchanged files are served from the parse cache when one is given. Files that are only read
+    can be loaded with the fast loader; the documents are then plain dicts without comments, and
+    DataConnectorLink documents only carry their name and schema scalar_types/object_types.
+    With lazy, only documents of LOADED_KINDS are parsed and the others are returned as RawDocuments.
+    Reads and documents are counted in run_metrics, by default the run's metrics.
     """
-    with open(file_path, 'r') as file:
-        content = file.read()
+    run_metrics = run_metrics or metrics
+    with mapped_file(file_path) as content:
+        run_metrics.count('files_read')
+        run_metrics.count('bytes_read', len(content))
+
+        variant = ('fast' if fast else '') + ('-lazy' if lazy else '')
+        if cache:
+            cached_docs = cache.get(file_path, content, variant)
+            if cached_docs is not None:
+                run_metrics.count_documents(cached_docs)
+                return cached_docs
+
+        # Documents are decoded from the mapped file one at a time
+        load = mapping_loader(fast_load_document if fast else yaml.load)
+        try:
+            if lazy:
+                parsed_docs = [doc for doc in load_lazily(iter_documents(content), load) if doc]
+            else:
+                parsed_docs = []
+                for doc in trimmed_documents(iter_documents(content)):
+                    parsed_doc = load(doc)
+                    if parsed_doc:
+                        parsed_docs.append(parsed_doc)
+        except Exception as e:
+            # e.g. `--- !tag` or `...` markers, which the splitter leaves inside documents; load_all handles them
+            logging.debug(f"Loading {file_path} document by document failed, loading it as one stream: {str(e)}")
+            parsed_docs = [doc for doc in (fast_yaml if fast else yaml).load_all(content[:].decode('utf-8')) if doc]
+
+        if cache:
+            cache.put(file_path, content, parsed_docs, variant)
+
+    run_metrics.count_documents(parsed_docs)
+    return parsed_docs
 
-    yaml_docs = content.split('---')
-    parsed_docs = []
+def contains_model(file_path: str) -> bool:
+    """
+    Check whether a file holds a Model document by scanning its raw bytes, without parsing it.
+    """
+    with open(file_path, 'rb') as f:
+        return MODEL_KIND_PATTERN.search(f.read()) is not None
+
+def project_walker(include: Tuple[str, ...] = ('*.hml',), exclude: Optional[List[str]] = None, use_gitignore: bool = True) -> ProjectWalker:
+    """
+    A walker listing files in sorted order; exclude defaults to node_modules and hidden files and directories.
+    """
+    return ProjectWalker(include, DEFAULT_EXCLUDE if exclude is None else exclude, use_gitignore, sort=True)
 
-    for doc in yaml_docs:
-        if doc.strip():
-            parsed_doc = yaml.load(doc)
-            if parsed_doc:
-                parsed_docs.append(parsed_doc)
+def find_hml_files(project_path: str, walker: Optional[ProjectWalker] = None) -> List[str]:
+    """
+    List the absolute paths of all HML files under a project directory in sorted order, skipping
+    node_modules, hidden and git-ignored directories without descending into them.
+    """
+    return list((walker or project_walker()).walk(os.path.abspath(project_path)))
 
-    return parsed_docs
+def discover_model_files(models_dir: str, pattern: str = '*.hml', jobs: int = 1, walker: Optional[ProjectWalker] = None) -> List[str]:
+    """
+    Find the files under models_dir that match pattern and hold a Model, in sorted order. A pattern with a
+    slash is matched against the path relative to models_dir, where `*` also matches across directories,
+    one without against the file name. Matching files are only sniffed for a `kind: Model` line, using
+    jobs threads; the rest are never opened. walker supplies the exclude and .gitignore settings.
+    """
+    models_dir = os.path.abspath(models_dir)
+    walker = walker or project_walker()
+    candidates = list(project_walker((pattern,), walker.exclude, walker.use_gitignore).walk(models_dir))
+
+    if jobs > 1 and len(candidates) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            has_model = list(executor.map(contains_model, candidates))
+    else:
+        has_model = [contains_model(file_path) for file_path in candidates]
+
+    model_files = [file_path for file_path, model in zip(candidates, has_model) if model]
+    logging.info(f"Discovered {len(model_files)} model files among {len(candidates)} files matching {pattern} under {models_dir}")
+    return model_files
+
+def build_metadata_index(hml_files: List[str], cache: Optional[ParseCache] = None, lazy: bool = False) -> MetadataIndex:
+    """
+    Parse files that are only read with the fast loader and index their documents by absolute path.
+    """
+    metadata_index = MetadataIndex()
+    for file_path in hml_files:
+        try:
+            documents = parse_hml_file(file_path, cache, fast=True, lazy=lazy)
+        except Exception as e:
+            logging.warning(f"Skipping {file_path}, it could not be parsed: {str(e)}")
+            continue
+        metadata_index.add_file(os.path.abspath(file_path), documents)
+    return metadata_index
+
+def discover_connectors(metadata_index: MetadataIndex) -> List[Tuple[str, str]]:
+    """
+    Find (data connector link file, data connector link types file) pairs among the indexed files.
+    The types file is the sibling `<link>-types.hml`, or otherwise the file holding the connector's
+    DataConnectorScalarRepresentations. Pairs are returned in indexing order.
+    """
+    connectors = []
+    for entry in metadata_index.of_kind('DataConnectorLink'):
+        types_file = f"{entry.file[:-len('.hml')]}-types.hml"
+        if types_file not in metadata_index:
+            connector_name = entry.definition.get('name')
+            representations = metadata_index.of_connector('DataConnectorScalarRepresentation', connector_name) if connector_name else []
+            types_file = next((representation.file for representation in representations if representation.file != entry.file), None)
+        if not types_file:
+            logging.warning(f"No data connector link types file found for: {entry.file}")
+        elif (entry.file, types_file) not in connectors:
+            connectors.append((entry.file, types_file))
+
+    return connectors
 
 def extract_scalar_types(connector_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
     """
@@ -52,17 +247,23 @@ def extract_scalar_types(connector_data: Dict[str, Any]) -> Dict[str, Dict[str,
 
     return scalar_types
 
-def extract_scalar_representations(types_data: List[Dict[str, Any]], scalar_types: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, str], List[str]]:
+def extract_scalar_representations(types_data: List[Dict[str, Any]], scalar_types: Dict[str, Dict[str, Any]], connector_name: Optional[str] = None) -> Tuple[Dict[str, str], List[str]]:
     """
     Extract scalar representations from the types data and identify missing scalar types.
+    With connector_name, representations of other connectors are skipped, since a types file may be
+    shared by several connectors.
     """
     scalar_representations = {}
     existing_scalar_types = set()
 
     for doc in types_data:
+        if isinstance(doc, RawDocument):
+            continue
         if doc.get('kind') == 'ScalarType':
             existing_scalar_types.add(doc.get('definition', {}).get('name'))
         elif doc.get('kind') == 'DataConnectorScalarRepresentation':
+            if connector_name is not None and doc.get('definition', {}).get('dataConnectorName', connector_name) != connector_name:
+                continue
             scalar_type = doc.get('definition', {}).get('dataConnectorScalarType')
             representation = doc.get('definition', {}).get('representation')
             if scalar_type and representation:
@@ -173,59 +374,124 @@ def generate_aggregate_expression(scalar_type: str, aggregate_functions: Dict[st
 
     return expression
 
-def write_aggregate_expressions(scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str], connector_name: str, output_file: str) -> None:
+def generate_scalar_aggregate_expressions(scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str], connector_name: str) -> List[Dict[str, Any]]:
     """
-    Write AggregateExpressions to the output file.
+    Generate AggregateExpressions for every scalar type with a representation and aggregate functions.
     """
     valid_scalar_types = [
         scalar_type for scalar_type, data in scalar_types.items()
         if scalar_type in scalar_representations and data['aggregate_functions']
     ]
 
-    with open(output_file, 'w') as f:
-        f.write('---\n')
-        for index, scalar_type in enumerate(valid_scalar_types, start=1):
-            data = scalar_types[scalar_type]
-            expression = generate_aggregate_expression(
-                scalar_type, 
-                data['aggregate_functions'],
-                connector_name,
-                scalar_representations
-            )
-            yaml.dump(expression, f)
-
-            # Add separator only if it's not the last item
-            if index < len(valid_scalar_types):
-                f.write('\n---\n')
-
-            # Log the scalar type and its aggregate functions
-            logging.info(f"[{index}] Added aggregate functions for scalar type: {scalar_type}")
-            logging.info(f"[{index}] Aggregate functions: {', '.join(data['aggregate_functions'].keys())}")
+    expressions = []
+    for index, scalar_type in enumerate(valid_scalar_types, start=1):
+        data = scalar_types[scalar_type]
+        expressions.append(generate_aggregate_expression(
+            scalar_type, 
+            data['aggregate_functions'],
+            connector_name,
+            scalar_representations
+        ))
+
+        # Log the scalar type and its aggregate functions
+        logging.info(f"[{index}] Added aggregate functions for scalar type: {scalar_type}")
+        logging.info(f"[{index}] Aggregate functions: {', '.join(data['aggregate_functions'].keys())}")
 
     # Log skipped scalar types
     for index, (scalar_type, data) in enumerate(scalar_types.items(), start=1):
         if scalar_type not in scalar_representations or not data['aggregate_functions']:
             logging.info(f"[{index}] Skipped scalar type: {scalar_type} (no representation or aggregate functions)")
 
-def generate_model_aggregate_expression(model_name: str, object_type: Dict[str, Any], scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str]) -> Dict[str, Any]:
+    return expressions
+
+# GraphQL type names of a scalar AggregateExpression, renamed together with the expression on collisions
+AGGREGATE_GRAPHQL_NAME_KEYS = ('selectTypeName', 'orderByInputTypeName', 'aggregatePredicateInputTypeName', 'aggregateBoolExpInputTypeName', 'aggregateSelectInputTypeName')
+
+def resolve_aggregate_expression_names(connectors: List[Dict[str, Any]]) -> None:
+    """
+    Make scalar AggregateExpression names unique across connectors. Connectors are handled in the order
+    given: the first one to produce `{aggregated_type}_aggregate_exp` keeps it, later ones get their
+    connector name as a prefix on the expression and its GraphQL type names. Each connector's
+    'expression_names' maps the plain name to the name actually used.
+    """
+    used_names = set()
+    for connector in connectors:
+        expression_names = {}
+        for expression in connector['scalar_aggregate_expressions']:
+            definition = expression['definition']
+            name = definition['name']
+            if name in used_names:
+                prefix = f"{connector['name']}_"
+                definition['name'] = f"{prefix}{name}"
+                for key in AGGREGATE_GRAPHQL_NAME_KEYS:
+                    definition['graphql'][key] = f"{prefix}{definition['graphql'][key]}"
+                expression_names[name] = definition['name']
+                logging.warning(f"AggregateExpression {name} of connector {connector['name']} is already defined by another connector, renamed to {definition['name']}")
+            used_names.add(definition['name'])
+        connector['expression_names'] = expression_names
+
+def dump_generated_document(document: Dict[str, Any], stream: io.StringIO, emitter: str = 'fast') -> None:
+    """
+    Write a generated document to stream. The fast emitter produces the same bytes as yaml.dump and
+    hands documents it does not support back to it.
+    """
+    text = emit_document(document) if emitter == 'fast' else None
+    if text is None:
+        yaml.dump(document, stream)
+    else:
+        stream.write(text)
+
+def write_aggregate_expressions(scalar_aggregate_expressions: List[Dict[str, Any]], output_file: str, model_aggregate_expressions: Optional[List[Dict[str, Any]]] = None, emitter: str = 'fast') -> None:
+    """
+    Write scalar AggregateExpressions, followed by any model AggregateExpressions, to the output file.
+    """
+    f = io.StringIO()
+    f.write('---\n')
+    for index, expression in enumerate(scalar_aggregate_expressions, start=1):
+        dump_generated_document(expression, f, emitter)
+
+        # Add separator only if it's not the last item
+        if index < len(scalar_aggregate_expressions):
+            f.write('\n---\n')
+
+    for expression in model_aggregate_expressions or []:
+        f.write('\n---\n')
+        dump_generated_document(expression, f, emitter)
+
+    if write_if_changed(output_file, f.getvalue()):
+        logging.info(f"Wrote aggregate expressions to: {output_file}")
+    else:
+        logging.info(f"Aggregate expressions unchanged in: {output_file}")
+
+def build_aggregatable_scalar_index(scalar_types: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Map the lower-cased name of every scalar type that has aggregate functions to its connector scalar type name.
+    """
+    aggregatable_scalars = {}
+    for scalar_type, data in scalar_types.items():
+        if data.get('aggregate_functions'):
+            aggregatable_scalars.setdefault(scalar_type.lower(), scalar_type)
+    return aggregatable_scalars
+
+def generate_model_aggregate_expression(model_name: str, object_type: Dict[str, Any], scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str], aggregatable_scalars: Optional[Dict[str, str]] = None, expression_names: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     """
     Generate an AggregateExpression for a given Model.
+    expression_names maps scalar AggregateExpression names that were renamed by resolve_aggregate_expression_names.
     """
+    if aggregatable_scalars is None:
+        aggregatable_scalars = build_aggregatable_scalar_index(scalar_types)
+
     aggregatable_fields = []
     for field in object_type['fields']:
         field_name = field['name']
         field_type = field['type'].replace('!', '')
         if isinstance(field_type, dict):
             field_type = field_type.get('type', '')
-        if next(
-            (
-                key for key in scalar_types
-                if key.lower() == field_type.lower() and scalar_types.get(key, {}).get('aggregate_functions')
-            ), None
-        ):
+        if aggregatable_scalars.get(field_type.lower()):
+            aggregate_expression_name = f"{field_type}_aggregate_exp"
             aggregatable_fields.append({
                 "fieldName": field_name,
-                "aggregateExpression": f"{field_type}_aggregate_exp"
+                "aggregateExpression": (expression_names or {}).get(aggregate_expression_name, aggregate_expression_name)
             })
 
     expression = {
@@ -247,24 +513,67 @@ def generate_model_aggregate_expression(model_name: str, object_type: Dict[str,
     }
     return expression
 
-def update_data_connector_link_types(file_path: str, new_definitions: List[Dict[str, Any]]) -> None:
+def dump_source_document(document: Any, stream: io.StringIO) -> None:
+    """
+    Dump a parsed document of a file being rewritten, or write a RawDocument back as it was read.
+    """
+    if isinstance(document, RawDocument):
+        stream.write(document.text)
+    else:
+        yaml.dump(document, stream)
+
+def update_data_connector_link_types(file_path: str, new_definitions: List[Dict[str, Any]], cache: Optional[ParseCache] = None, existing_docs: Optional[List[Any]] = None) -> None:
     """
     Update the data connector link types file with new scalar type definitions.
+    existing_docs can pass the file's already parsed documents to avoid parsing it again.
     """
-    existing_docs = parse_hml_file(file_path)
+    if existing_docs is None:
+        existing_docs = parse_hml_file(file_path, cache)
 
-    with open(file_path, 'w') as f:
-        f.write('---\n')
-        for i, doc in enumerate(existing_docs + new_definitions):
-            if i > 0:
-                f.write('\n---\n')
-            yaml.dump(doc, f)
+    f = io.StringIO()
+    f.write('---\n')
+    for i, doc in enumerate(existing_docs + new_definitions):
+        if i > 0:
+            f.write('\n---\n')
+        dump_source_document(doc, f)
 
-    logging.info(f"Updated data connector link types file: {file_path}")
+    if write_if_changed(file_path, f.getvalue()):
+        logging.info(f"Updated data connector link types file: {file_path}")
+    else:
+        logging.info(f"Data connector link types file unchanged: {file_path}")
     for def_type in set(d['kind'] for d in new_definitions):
         count = sum(1 for d in new_definitions if d['kind'] == def_type)
         logging.info(f"Added {count} new {def_type} definitions")
 
+def add_missing_scalar_types(connectors: List[Dict[str, Any]], cache: Optional[ParseCache] = None) -> None:
+    """
+    Generate the missing ScalarType and DataConnectorScalarRepresentation definitions of every connector,
+    stored as its 'new_scalar_definitions', and add them to its types file.
+    The types files were all parsed before any of them is written, so connectors sharing a types file
+    are written in one update; writing them one after the other would drop the definitions added by
+    the earlier ones. A ScalarType needed by several connectors, or already in the file, is written once.
+    """
+    types_files = {}
+    for connector in connectors:
+        connector['new_scalar_definitions'] = generate_scalar_type_definitions(connector['missing_scalar_types'], connector['name'])
+        types_documents = connector.pop('types_documents')
+        _, _, new_definitions = types_files.setdefault(os.path.abspath(connector['types_file']), (connector['types_file'], types_documents, []))
+        new_definitions.extend(connector['new_scalar_definitions'])
+
+    for file_path, existing_docs, new_definitions in types_files.values():
+        scalar_type_names = {
+            doc.get('definition', {}).get('name') for doc in existing_docs
+            if not isinstance(doc, RawDocument) and doc.get('kind') == 'ScalarType'
+        }
+        unique_definitions = []
+        for definition in new_definitions:
+            if definition['kind'] == 'ScalarType':
+                if definition['definition']['name'] in scalar_type_names:
+                    continue
+                scalar_type_names.add(definition['definition']['name'])
+            unique_definitions.append(definition)
+        update_data_connector_link_types(file_path, unique_definitions, cache, existing_docs)
+
 def update_graphql_config(file_path: str):
     """
     Update the GraphQL config file by adding the aggregate section if it doesn't exist.
@@ -289,141 +598,430 @@ def update_graphql_config(file_path: str):
             doc['definition'] = definition
 
     if updated:
-        with open(file_path, 'w') as f:
-            yaml.dump_all(documents, f)
+        f = io.StringIO()
+        yaml.dump_all(documents, f)
+        write_if_changed(file_path, f.getvalue())
         logging.info(f"Updated GraphQL config file: {file_path}")
     else:
         logging.info(f"No updates needed for GraphQL config file: {file_path}")
 
-def process_model_files(model_files: List[str], scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str], output_file: str) -> None:
+# Scalar types, representations and connectors that model workers generate against, set once per worker process
+_model_context: Dict[str, Any] = {}
+
+def _set_model_context(context: Dict[str, Any]) -> None:
+    global _model_context
+    _model_context = context
+
+def process_model_documents(model_file: str, documents: List[Dict[str, Any]], object_types: Dict[str, Optional[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], Optional[str], bool, int]:
     """
-    Process model files, generate AggregateExpressions for each Model, and update Model definitions.
+    Generate the AggregateExpressions of the Models in one file, update the Model definitions and write
+    the file back atomically. object_types maps each Model name to its resolved ObjectType, or None.
+    Returns (AggregateExpressions, name of the last Model, whether a Model was updated, bytes written).
     """
+    scalar_types = _model_context['scalar_types']
+    scalar_representations = _model_context['scalar_representations']
+    aggregatable_scalars = _model_context['aggregatable_scalars']
+    connectors = _model_context['connectors']
+
     model_aggregate_expressions = []
+    updated_documents = []
+    model_name = None
+    model_updated = False
 
-    for model_file in model_files:
+    for doc in documents:
+        if isinstance(doc, dict) and doc.get('kind') == 'Model':
+            model_name = doc['definition']['name']
+            object_type = object_types.get(model_name)
+
+            if object_type:
+                # Generate AggregateExpression against the Model's own connector
+                source_connector = (doc['definition'].get('source') or {}).get('dataConnectorName')
+                connector = (connectors or {}).get(source_connector)
+                if connector:
+                    aggregate_expression = generate_model_aggregate_expression(
+                        model_name, object_type,
+                        connector['scalar_types'],
+                        connector['scalar_representations'],
+                        connector['aggregatable_scalars'],
+                        connector['expression_names']
+                    )
+                else:
+                    aggregate_expression = generate_model_aggregate_expression(model_name, object_type, scalar_types, scalar_representations, aggregatable_scalars)
+                model_aggregate_expressions.append(aggregate_expression)
+
+                # Update Model definition only if new attributes don't exist
+                if 'aggregateExpression' not in doc['definition']:
+                    doc['definition']['aggregateExpression'] = f"{model_name}_aggregate_exp"
+                    model_updated = True
+
+                if 'graphql' not in doc['definition']:
+                    doc['definition']['graphql'] = {}
+
+                graphql = doc['definition']['graphql']
+                if 'filterInputTypeName' not in graphql:
+                    graphql['filterInputTypeName'] = f"{model_name}_filter_input"
+                    model_updated = True
+
+                if 'aggregate' not in graphql:
+                    graphql['aggregate'] = {
+                        "queryRootField": f"{model_name.lower()}_aggregate"
+                    }
+                    model_updated = True
+
+        updated_documents.append(doc)
+
+    # Write updated documents back to file
+    f = io.StringIO()
+    f.write('---\n')
+    for i, doc in enumerate(updated_documents):
+        if i > 0:
+            f.write('\n---\n')
+        dump_source_document(doc, f)
+    content = f.getvalue()
+    bytes_written = len(content.encode('utf-8')) if write_if_changed(model_file, content) else 0
+
+    return model_aggregate_expressions, model_name, model_updated, bytes_written
+
+def _process_model_item(item: Tuple[str, List[Dict[str, Any]], Dict[str, Optional[Dict[str, Any]]]]) -> Tuple[str, List[Dict[str, Any]], Optional[str], bool, Optional[int], Optional[str]]:
+    # Returns (model file, AggregateExpressions, last Model name, updated, bytes written or None if unchanged, error)
+    model_file, documents, object_types = item
+    try:
+        expressions, model_name, model_updated, bytes_written = process_model_documents(model_file, documents, object_types)
+        return model_file, expressions, model_name, model_updated, bytes_written or None, None
+    except Exception as e:
+        return model_file, [], None, False, None, str(e)
+
+def resolve_model_object_types(documents: List[Any], metadata_index: MetadataIndex) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Map each Model in a file's documents to its ObjectType, looked up in the same file first and then in
+    metadata_index, or to None when there is none. Documents that are not mappings are skipped.
+    """
+    parsed_documents = [doc for doc in documents if isinstance(doc, dict)]
+    file_object_types = {doc['definition']['name']: doc['definition'] for doc in parsed_documents if doc.get('kind') == 'ObjectType'}
+    object_types = {}
+    for doc in parsed_documents:
+        if doc.get('kind') == 'Model':
+            model_name = doc['definition']['name']
+            object_type = file_object_types.get(model_name)
+            if not object_type:
+                entry = metadata_index.get('ObjectType', doc['definition'].get('objectType') or model_name)
+                if entry:
+                    object_type = entry.definition
+                    logging.info(f"Using ObjectType {object_type.get('name')} from {entry.file} for model: {model_name}")
+                else:
+                    logging.warning(f"No matching ObjectType found for Model: {model_name}")
+            object_types[model_name] = object_type
+    return object_types
+
+def _load_model_file(model_file: str) -> Tuple[str, int, Optional[List[Any]], Optional[str]]:
+    # Returns (model file, bytes read, round-trip documents or None, error)
+    try:
         with open(model_file, 'r') as f:
             content = f.read()
+            size = os.fstat(f.fileno()).st_size
+        load = mapping_loader(yaml.load)
+        try:
+            if _model_context.get('lazy_load'):
+                return model_file, size, load_lazily(iter_documents(content), load), None
+            return model_file, size, [load(doc) for doc in trimmed_documents(iter_documents(content))], None
+        except Exception as e:
+            # e.g. `--- !tag` or `...` markers, which the splitter leaves inside documents; load_all handles them
+            logging.debug(f"Loading {model_file} document by document failed, loading it as one stream: {str(e)}")
+        return model_file, size, list(yaml.load_all(content)), None
+    except Exception as e:
+        return model_file, 0, None, str(e)
+
+def process_model_files(model_files: List[str], scalar_types: Dict[str, Dict[str, Any]], scalar_representations: Dict[str, str], aggregatable_scalars: Optional[Dict[str, str]] = None, connectors: Optional[Dict[str, Dict[str, Any]]] = None, metadata_index: Optional[MetadataIndex] = None, jobs: int = 1, lazy_load: bool = False) -> List[Dict[str, Any]]:
+    """
+    Process model files, generate AggregateExpressions for each Model, and update Model definitions.
+    When connectors (by name) are given, each Model uses the connector named in its source; Models of
+    other connectors use scalar_types and scalar_representations.
+    A Model's ObjectType is looked up in its own file first, then in the other model files and in
+    metadata_index, so it may live in a different file.
+    With jobs > 1 the files are parsed, updated and written by a worker pool; errors are reported per file at the end.
+    With lazy_load, documents of kinds other than LOADED_KINDS are not parsed and are written back unchanged.
+    Returns the generated model AggregateExpressions so they can be written with the scalar ones.
+    """
+    if aggregatable_scalars is None:
+        aggregatable_scalars = build_aggregatable_scalar_index(scalar_types)
+    if metadata_index is None:
+        metadata_index = MetadataIndex()
+
+    context = {
+        'scalar_types': scalar_types,
+        'scalar_representations': scalar_representations,
+        'aggregatable_scalars': aggregatable_scalars,
+        'connectors': {
+            name: {key: connector[key] for key in ('scalar_types', 'scalar_representations', 'aggregatable_scalars', 'expression_names')}
+            for name, connector in (connectors or {}).items()
+        },
+        'lazy_load': lazy_load,
+    }
+    # One pool parses the files and later rewrites them
+    executor = None
+    if jobs > 1 and len(model_files) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=min(jobs, len(model_files)), initializer=_set_model_context, initargs=(context,))
+        chunksize = max(1, len(model_files) // (jobs * 4))
+    else:
+        _set_model_context(context)
 
-        documents = list(yaml.load_all(content))
-
-        updated_documents = []
-        model_updated = False
-        object_types = {doc['definition']['name']: doc['definition'] for doc in documents if doc.get('kind') == 'ObjectType'}
-
-        for doc in documents:
-            if doc.get('kind') == 'Model':
-                model_name = doc['definition']['name']
-                object_type = object_types.get(model_name)
-
-                if object_type:
-                    # Generate AggregateExpression
-                    aggregate_expression = generate_model_aggregate_expression(model_name, object_type, scalar_types, scalar_representations)
-                    model_aggregate_expressions.append(aggregate_expression)
+    def map_items(function, items):
+        return executor.map(function, items, chunksize=chunksize) if executor else map(function, items)
 
-                    # Update Model definition only if new attributes don't exist
-                    if 'aggregateExpression' not in doc['definition']:
-                        doc['definition']['aggregateExpression'] = f"{model_name}_aggregate_exp"
-                        model_updated = True
+    model_aggregate_expressions = []
+    errors = []
+    try:
+        model_documents = {}
+        for model_file, size, documents, error in map_items(_load_model_file, model_files):
+            if error is not None:
+                errors.append((model_file, error))
+                continue
+            metrics.count('files_read')
+            metrics.count('bytes_read', size)
+            metrics.count_documents(documents)
+            model_documents[model_file] = documents
+            if os.path.abspath(model_file) not in metadata_index:
+                metadata_index.add_file(os.path.abspath(model_file), documents)
+
+        # Resolve every Model's ObjectType up front, where the whole index is available
+        items = []
+        for model_file, documents in model_documents.items():
+            try:
+                items.append((model_file, documents, resolve_model_object_types(documents, metadata_index)))
+            except Exception as e:
+                errors.append((model_file, str(e)))
+
+        for model_file, expressions, model_name, model_updated, bytes_written, error in map_items(_process_model_item, items):
+            if error is not None:
+                errors.append((model_file, error))
+                continue
+            model_aggregate_expressions.extend(expressions)
+            if executor:
+                # Workers count into their own copy of the metrics
+                metrics.count('files_written' if bytes_written else 'files_unchanged')
+                metrics.count('bytes_written', bytes_written or 0)
+            if model_name is None:
+                logging.info(f"No Model found in: {model_file}")
+            elif model_updated:
+                logging.info(f"Updated Model definition and generated AggregateExpression for model: {model_name}")
+            else:
+                logging.info(f"No updates needed for model: {model_name}")
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if errors:
+        logging.error(f"{len(errors)} model file(s) could not be processed:")
+        for model_file, error in errors:
+            logging.error(f"  {model_file}: {error}")
+
+    return model_aggregate_expressions
+
+def find_data_connector_link(documents: List[Any]) -> Optional[Dict[str, Any]]:
+    """
+    The first DataConnectorLink among parsed documents.
+    """
+    return next((doc for doc in documents if not isinstance(doc, RawDocument) and doc.get('kind') == 'DataConnectorLink'), None)
 
-                    if 'graphql' not in doc['definition']:
-                        doc['definition']['graphql'] = {}
+def load_connector(link_file: str, types_file: str, fast_load: bool = False, cache_settings: Optional[Tuple[str, int]] = None, lazy_load: bool = False, data_connector_link: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parse one connector's link and types files and extract its scalar types and representations.
+    When the DataConnectorLink document is given, e.g. from the metadata index, the link file is not read again.
+    Runs in a worker process when several connectors are loaded in parallel.
+    """
+    cache = ParseCache(cache_settings[0], 'aggregate-expression-types', cache_settings[1]) if cache_settings else None
+    # Counted separately and merged by the caller, since this may run in a worker process
+    connector_metrics = RunMetrics('aggregate-expression-types')
 
-                    graphql = doc['definition']['graphql']
-                    if 'filterInputTypeName' not in graphql:
-                        graphql['filterInputTypeName'] = f"{model_name}_filter_input"
-                        model_updated = True
+    # Parse the connector file and find the DataConnectorLink document
+    if data_connector_link is None:
+        data_connector_link = find_data_connector_link(parse_hml_file(link_file, cache, fast_load, connector_metrics, lazy_load))
 
-                    if 'aggregate' not in graphql:
-                        graphql['aggregate'] = {
-                            "queryRootField": f"{model_name.lower()}_aggregate"
-                        }
-                        model_updated = True
-                else:
-                    logging.warning(f"No matching ObjectType found for Model: {model_name}")
+    if not data_connector_link:
+        logging.error(f"No DataConnectorLink found in the connector file: {link_file}")
+        return None
 
-            updated_documents.append(doc)
+    # Extract scalar types and their aggregate functions
+    scalar_types = extract_scalar_types(data_connector_link)
+    connector_name = data_connector_link.get('definition', {}).get('name', 'unknown')
 
-        # Write updated documents back to file
-        with open(model_file, 'w') as f:
-            f.write('---\n')
-            for i, doc in enumerate(updated_documents):
-                if i > 0:
-                    f.write('\n---\n')
-                yaml.dump(doc, f)
+    # Parse the types file and extract scalar representations
+    types_documents = parse_hml_file(types_file, cache, run_metrics=connector_metrics, lazy=lazy_load)
+    scalar_representations, missing_scalar_types = extract_scalar_representations(types_documents, scalar_types, connector_name)
+
+    return {
+        'name': connector_name,
+        'link_file': link_file,
+        'types_file': types_file,
+        'scalar_types': scalar_types,
+        'scalar_representations': scalar_representations,
+        'missing_scalar_types': missing_scalar_types,
+        'types_documents': types_documents,
+        'cache_stats': (cache.hits, cache.misses) if cache else (0, 0),
+        'metrics': (connector_metrics.counters, connector_metrics.documents_by_kind),
+    }
 
-        if model_updated:
-            logging.info(f"Updated Model definition and generated AggregateExpression for model: {model_name}")
-        else:
-            logging.info(f"No updates needed for model: {model_name}")
+def _load_connector_item(item: Tuple[str, str, bool, Optional[Tuple[str, int]], bool, Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    return load_connector(*item)
 
-    # Append model aggregate expressions to the output file
-    with open(output_file, 'a') as f:
-        for expression in model_aggregate_expressions:
-            f.write('\n---\n')
-            yaml.dump(expression, f)
+def split_paths(values: Optional[List[str]]) -> List[str]:
+    """
+    Flatten repeated and comma-separated path arguments.
+    """
+    return [path for value in values or [] for path in value.split(',') if path]
 
 def main():
     parser = argparse.ArgumentParser(description="Process HML files and generate aggregate expressions.")
-    parser.add_argument('--data-connector-link', required=True, help="Path to the data connector link file (e.g., mong.hml)")
-    parser.add_argument('--data-connector-link-types', required=True, help="Path to the data connector link types file (e.g., mong-types.hml)")
-    parser.add_argument('--models', required=True, help="Comma-separated list of model files")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    parser.add_argument('--data-connector-link', action='append', help="Path to a data connector link file (e.g., mong.hml); repeat or comma-separate for several connectors")
+    parser.add_argument('--data-connector-link-types', action='append', help="Path to the data connector link types file (e.g., mong-types.hml) of each --data-connector-link, in the same order")
+    parser.add_argument('--project-path', help="Discover data connector links and their types files under this directory")
+    parser.add_argument('--models', help="Comma-separated list of model files")
+    parser.add_argument('--models-dir', help="Discover the model files, the files holding a Model, under this directory")
+    parser.add_argument('--models-pattern', default='*.hml', help="Pattern of the files considered under --models-dir; one with a slash matches the path relative to it (default: %(default)s)")
+    parser.add_argument('--exclude', action='append', help=f"File and directory patterns skipped by --project-path and --models-dir, comma-separated and repeatable; excluded directories are not descended into (default: {','.join(DEFAULT_EXCLUDE)})")
+    parser.add_argument('--no-gitignore', action='store_true', help="Also search files and directories ignored by .gitignore files under --project-path and --models-dir")
     parser.add_argument('--output-file', required=True, help="Path to the output file for aggregate expressions")
     parser.add_argument('--graphql-config', required=True, help="Path to the GraphQL config file")
+    parser.add_argument('--fast-load', action='store_true', help="Read the data connector link, which is never rewritten, with a fast safe loader")
+    parser.add_argument('--lazy-load', action='store_true', help="Only parse documents of the kinds the tool reads or changes; the others are found by their kind: line and written back unchanged")
+    parser.add_argument('--cache-dir', help="Directory for a persistent parse cache; unchanged files are not re-parsed on later runs")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_CACHE_BYTES // (1024 * 1024), help="Size bound of the parse cache in megabytes (default: %(default)s)")
+    parser.add_argument('--jobs', type=int, default=1, help="Number of worker processes used to load connectors and rewrite model files (0 uses all CPUs, default: 1)")
+    parser.add_argument('--emitter', choices=('fast', 'ruamel'), default='fast', help="Serializer for the generated AggregateExpressions; both write identical YAML (default: %(default)s)")
+    parser.add_argument('--metrics', help="Write per-stage timings, I/O and document counts and peak memory of the run as JSON to this file")
+    parser.add_argument('--metrics-allocations', action='store_true', help="With --metrics, also trace the peak of Python allocations; this slows the run down several times, so stage timings are not representative")
 
     args = parser.parse_args()
 
-    print(f"Processing with data connector link: {args.data_connector_link}")
-    print(f"Data connector link types: {args.data_connector_link_types}")
-    print(f"Models: {args.models}")
+    if args.metrics_allocations and not args.metrics:
+        parser.error("--metrics-allocations requires --metrics")
+    if args.metrics:
+        metrics.start(trace_allocations=args.metrics_allocations)
+
+    cache = ParseCache(args.cache_dir, 'aggregate-expression-types', args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    cache_settings = (args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    walker = project_walker(exclude=split_patterns(args.exclude) if args.exclude else None, use_gitignore=not args.no_gitignore)
+    model_files = args.models.split(',') if args.models else []
+    if args.models_dir:
+        with metrics.stage('discovery'):
+            listed = {os.path.abspath(model_file) for model_file in model_files}
+            model_files += [model_file for model_file in discover_model_files(args.models_dir, args.models_pattern, jobs, walker) if model_file not in listed]
+    elif not args.models:
+        parser.error("no model files given; use --models or --models-dir")
+    metadata_index = None
+    if args.project_path:
+        # Model files are indexed as they are loaded for rewriting
+        model_paths = {os.path.abspath(model_file) for model_file in model_files}
+        with metrics.stage('discovery'):
+            metadata_index = build_metadata_index([path for path in find_hml_files(args.project_path, walker) if path not in model_paths], cache, args.lazy_load)
+
+    link_files = split_paths(args.data_connector_link)
+    types_files = split_paths(args.data_connector_link_types)
+    if len(link_files) != len(types_files):
+        parser.error("--data-connector-link and --data-connector-link-types must be given the same number of files")
+    connector_files = list(zip(link_files, types_files))
+    if metadata_index:
+        given = {(os.path.abspath(link_file), os.path.abspath(types_file)) for link_file, types_file in connector_files}
+        connector_files += [pair for pair in discover_connectors(metadata_index) if pair not in given]
+    if not connector_files:
+        parser.error("no data connector link given; use --data-connector-link/--data-connector-link-types or --project-path")
+
+    for link_file, types_file in connector_files:
+        print(f"Processing with data connector link: {link_file}")
+        print(f"Data connector link types: {types_file}")
+    if args.models:
+        print(f"Models: {args.models}")
+    if args.models_dir:
+        print(f"Models directory: {args.models_dir} ({len(model_files)} model files)")
     print(f"Output file: {args.output_file}")
     print(f"GraphQL config: {args.graphql_config}")
 
-    # Parse the connector file
-    connector_documents = parse_hml_file(args.data_connector_link)
-
-    # Find the DataConnectorLink document
-    data_connector_link = next((doc for doc in connector_documents if doc.get('kind') == 'DataConnectorLink'), None)
+    # Load the connectors, in parallel when there are several; results keep the connector order.
+    # Link files already parsed for the metadata index are not parsed again.
+    items = [
+        (link_file, types_file, args.fast_load, cache_settings, args.lazy_load,
+         find_data_connector_link(metadata_index.documents(os.path.abspath(link_file))) if metadata_index else None)
+        for link_file, types_file in connector_files
+    ]
+    with metrics.stage('load_connectors'):
+        if min(jobs, len(items)) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as executor:
+                connectors = list(executor.map(_load_connector_item, items))
+        else:
+            connectors = [_load_connector_item(item) for item in items]
 
-    if not data_connector_link:
-        logging.error("No DataConnectorLink found in the connector file")
+    if not all(connectors):
         return
+    for connector in connectors:
+        metrics.merge(*connector['metrics'])
 
-    # Extract scalar types and their aggregate functions
-    scalar_types = extract_scalar_types(data_connector_link)
-
-    # Parse the types file and extract scalar representations
-    types_documents = parse_hml_file(args.data_connector_link_types)
-    scalar_representations, missing_scalar_types = extract_scalar_representations(types_documents, scalar_types)
+    with metrics.stage('generate_scalar_aggregate_expressions'):
+        # Generate the missing scalar type definitions and update the data connector link types files
+        add_missing_scalar_types(connectors, cache)
 
-    # Get the connector name
-    connector_name = data_connector_link.get('definition', {}).get('name', 'unknown')
+        for connector in connectors:
+            connector_name = connector['name']
+            logging.info(f"Processing connector: {connector_name}")
 
-    logging.info(f"Processing connector: {connector_name}")
+            # Combine existing and new DataConnectorScalarRepresentation definitions
+            all_scalar_representations = connector['scalar_representations'].copy()
+            for definition in connector['new_scalar_definitions']:
+                if definition['kind'] == 'DataConnectorScalarRepresentation':
+                    scalar_type = definition['definition']['dataConnectorScalarType']
+                    representation = definition['definition']['representation']
+                    all_scalar_representations[scalar_type] = representation
+            connector['scalar_representations'] = all_scalar_representations
 
-    # Generate new scalar type definitions
-    new_scalar_definitions = generate_scalar_type_definitions(missing_scalar_types, connector_name)
+            connector['scalar_aggregate_expressions'] = generate_scalar_aggregate_expressions(connector['scalar_types'], all_scalar_representations, connector_name)
+            connector['aggregatable_scalars'] = build_aggregatable_scalar_index(connector['scalar_types'])
 
-    # Update the data connector link types file
-    update_data_connector_link_types(args.data_connector_link_types, new_scalar_definitions)
-
-     # Combine existing and new DataConnectorScalarRepresentation definitions
-    all_scalar_representations = scalar_representations.copy()
-    for definition in new_scalar_definitions:
-        if definition['kind'] == 'DataConnectorScalarRepresentation':
-            scalar_type = definition['definition']['dataConnectorScalarType']
-            representation = definition['definition']['representation']
-            all_scalar_representations[scalar_type] = representation
-
-    # Write the aggregate expressions to the output file
-    write_aggregate_expressions(scalar_types, all_scalar_representations, connector_name, args.output_file)
+        # Aggregate expression names must be unique across connectors
+        resolve_aggregate_expression_names(connectors)
 
     # Update the GraphQL config file
-    update_graphql_config(args.graphql_config)
-
-    # Process model files and generate AggregateExpressions for each Model
-    model_files = args.models.split(',')
-    process_model_files(model_files, scalar_types, all_scalar_representations, args.output_file)
+    with metrics.stage('update_graphql_config'):
+        update_graphql_config(args.graphql_config)
+
+    # Process model files once and generate AggregateExpressions for each Model against its connector
+    default_connector = connectors[0]
+    with metrics.stage('process_model_files'):
+        model_aggregate_expressions = process_model_files(
+            model_files,
+            default_connector['scalar_types'],
+            default_connector['scalar_representations'],
+            default_connector['aggregatable_scalars'],
+            {connector['name']: connector for connector in connectors},
+            metadata_index,
+            jobs,
+            args.lazy_load
+        )
+
+    # Write the scalar and model aggregate expressions to the output file
+    scalar_aggregate_expressions = [expression for connector in connectors for expression in connector['scalar_aggregate_expressions']]
+    with metrics.stage('write_output'):
+        write_aggregate_expressions(scalar_aggregate_expressions, args.output_file, model_aggregate_expressions, args.emitter)
+
+    logging.info(f"Files written: {metrics.counters['files_written']}, skipped as unchanged: {metrics.counters['files_unchanged']}")
+
+    if cache:
+        hits = cache.hits + sum(connector['cache_stats'][0] for connector in connectors)
+        misses = cache.misses + sum(connector['cache_stats'][1] for connector in connectors)
+        logging.info(f"Parse cache: {hits} hits, {misses} misses")
+        with metrics.stage('cache_prune'):
+            cache.prune()
+
+    if args.metrics:
+        metrics.write(args.metrics)
+        logging.info(f"Metrics written to {args.metrics}")
 
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        # Lets --jobs worker processes start from a PyInstaller executable
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
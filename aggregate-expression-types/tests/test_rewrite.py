@@ -0,0 +1,154 @@
+import os
+import sys
+import tempfile
+import subprocess
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATA_CONNECTOR_LINK = """kind: DataConnectorLink
+version: v1
+definition:
+  name: mydb
+  url:
+    singleUrl:
+      value: http://localhost:8080
+  schema:
+    version: v0.1
+    schema:
+      scalar_types:
+        int4:
+          representation:
+            type: int32
+          aggregate_functions:
+            max:
+              result_type:
+                type: nullable
+                underlying_type:
+                  type: named
+                  name: int4
+            sum:
+              result_type:
+                type: nullable
+                underlying_type:
+                  type: named
+                  name: float8
+          comparison_operators:
+            _eq:
+              type: equal
+        float8:
+          representation:
+            type: float64
+          aggregate_functions:
+            max:
+              result_type:
+                type: nullable
+                underlying_type:
+                  type: named
+                  name: float8
+          comparison_operators:
+            _eq:
+              type: equal
+      object_types: {}
+      collections: []
+      functions: []
+      procedures: []
+"""
+
+# float8 has no representation yet, so the first run adds its definitions to this file
+DATA_CONNECTOR_LINK_TYPES = """---
+kind: ScalarType
+version: v1
+definition:
+  name: Int4
+  graphql:
+    typeName: Int4
+
+---
+kind: DataConnectorScalarRepresentation
+version: v1
+definition:
+  dataConnectorName: mydb
+  dataConnectorScalarType: int4
+  representation: Int4
+  graphql:
+    comparisonExpressionTypeName: Int4ComparisonExp
+"""
+
+MODEL = """---
+kind: ObjectType
+version: v1
+definition:
+  name: Orders
+  fields:
+    - name: id
+      type: Int4!
+    - name: total
+      type: Float8
+
+---
+kind: Model
+version: v1
+definition:
+  name: Orders
+  objectType: Orders
+  source:
+    dataConnectorName: mydb
+    collection: orders
+  graphql:
+    selectMany:
+      queryRootField: orders
+"""
+
+GRAPHQL_CONFIG = """kind: GraphqlConfig
+version: v1
+definition:
+  query:
+    rootOperationTypeName: Query
+"""
+
+class RewriteTest(unittest.TestCase):
+    def run_tool(self, root, *args):
+        command = [
+            sys.executable, '-m', 'aggregate_expression_types.main',
+            '--data-connector-link', os.path.join(root, 'mydb.hml'),
+            '--data-connector-link-types', os.path.join(root, 'mydb-types.hml'),
+            '--models', os.path.join(root, 'Orders.hml'),
+            '--output-file', os.path.join(root, 'aggregate-expressions.hml'),
+            '--graphql-config', os.path.join(root, 'graphql-config.hml'),
+            *args,
+        ]
+        subprocess.run(command, cwd=TOOL_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def snapshot(self, root):
+        # File name -> (content, mtime); a file that is left alone keeps both
+        files = {}
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                files[name] = (f.read(), os.stat(path).st_mtime_ns)
+        return files
+
+    def assert_second_run_rewrites_nothing(self, *args):
+        with tempfile.TemporaryDirectory() as root:
+            for name, content in (('mydb.hml', DATA_CONNECTOR_LINK), ('mydb-types.hml', DATA_CONNECTOR_LINK_TYPES),
+                                  ('Orders.hml', MODEL), ('graphql-config.hml', GRAPHQL_CONFIG)):
+                with open(os.path.join(root, name), 'w') as f:
+                    f.write(content)
+
+            self.run_tool(root, *args)
+            first = self.snapshot(root)
+            self.assertIn(b'dataConnectorScalarType: float8', first['mydb-types.hml'][0])
+            self.assertIn(b'aggregateExpression: Orders_aggregate_exp', first['Orders.hml'][0])
+
+            self.run_tool(root, *args)
+            self.assertEqual(first, self.snapshot(root))
+
+    def test_second_run_rewrites_nothing(self):
+        self.assert_second_run_rewrites_nothing()
+
+    def test_second_lazy_load_run_rewrites_nothing(self):
+        self.assert_second_run_rewrites_nothing('--lazy-load')
+
+if __name__ == '__main__':
+    unittest.main()
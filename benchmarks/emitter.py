@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# Compares the fast emitter with yaml.dump on the documents both generators produce for a synthetic project,
+# checks that their output is identical and reports how many documents fell back to yaml.dump.
+#
+#   python benchmarks/emitter.py [--object-types 500] [--repeat 5]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    os.path.join(REPO_ROOT, 'boolean-expression-types'),
+    os.path.join(REPO_ROOT, 'aggregate-expression-types'),
+    os.path.join(REPO_ROOT, 'hml-common'),
+    os.path.dirname(os.path.abspath(__file__)),
+]
+
+from synthetic_project import add_size_arguments, generate_project
+from boolean_expression_types import main as boolean_main
+from hml_common.fast_emitter import emit_document
+from aggregate_expression_types import main as aggregate_main
+
+def boolean_documents(project: Dict[str, Any]) -> List[Dict[str, Any]]:
+    parsed_files = boolean_main.parse_hml_files(boolean_main.read_all_hml_files(project['root']))
+    _, boolean_expression_types = boolean_main.generate_from_parsed_files(parsed_files)
+    return boolean_expression_types
+
+def aggregate_documents(project: Dict[str, Any]) -> List[Dict[str, Any]]:
+    connectors = [aggregate_main.load_connector(subgraph['link_file'], subgraph['types_file']) for subgraph in project['subgraphs']]
+    documents = []
+    for connector in connectors:
+        connector['scalar_aggregate_expressions'] = aggregate_main.generate_scalar_aggregate_expressions(connector['scalar_types'], connector['scalar_representations'], connector['name'])
+        connector['aggregatable_scalars'] = aggregate_main.build_aggregatable_scalar_index(connector['scalar_types'])
+        documents.extend(connector['scalar_aggregate_expressions'])
+    aggregate_main.resolve_aggregate_expression_names(connectors)
+    model_files = [model_file for subgraph in project['subgraphs'] for model_file in subgraph['model_files']]
+    documents.extend(aggregate_main.process_model_files(
+        model_files,
+        connectors[0]['scalar_types'],
+        connectors[0]['scalar_representations'],
+        connectors[0]['aggregatable_scalars'],
+        {connector['name']: connector for connector in connectors}
+    ))
+    return documents
+
+def dump_ruamel(documents: List[Dict[str, Any]]) -> List[str]:
+    rendered = []
+    for document in documents:
+        output = io.StringIO()
+        boolean_main.yaml.dump(document, output)
+        rendered.append(output.getvalue())
+    return rendered
+
+def dump_fast(documents: List[Dict[str, Any]]) -> List[str]:
+    return [emit_document(document) for document in documents]
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast emitter against yaml.dump on generated documents.")
+    add_size_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per emitter; the fastest is kept (default: %(default)s)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory(prefix='hml-bench-') as root:
+        project = generate_project(root, args.subgraphs, args.object_types, args.fields, args.depth, args.models, args.scalar_types, args.types_per_file)
+        sets = [('BooleanExpressionTypes', boolean_documents(project)), ('AggregateExpressions', aggregate_documents(project))]
+
+    mismatches = 0
+    print(f"{'documents':<24} {'count':>7} {'fallback':>9} {'yaml.dump ms':>13} {'fast ms':>9} {'speedup':>8}")
+    for label, documents in sets:
+        expected = dump_ruamel(documents)
+        fast = dump_fast(documents)
+        fallback = sum(1 for text in fast if text is None)
+        mismatches += sum(1 for text, reference in zip(fast, expected) if text is not None and text != reference)
+        ruamel_seconds = best_time(lambda: dump_ruamel(documents), args.repeat)
+        fast_seconds = best_time(lambda: dump_fast(documents), args.repeat)
+        print(f"{label:<24} {len(documents):7d} {fallback:9d} {ruamel_seconds * 1000:13.1f} {fast_seconds * 1000:9.1f} {ruamel_seconds / fast_seconds:7.1f}x")
+
+    if mismatches:
+        print(f"{mismatches} documents differ from yaml.dump", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import math
+import time
+import logging
+import argparse
+import tempfile
+from typing import Any, Callable, Dict, List
+
+# Times every stage of both generators separately on synthetic projects of increasing size and reports
+# how each stage scales, so that a stage turning non-linear shows up as a growing exponent.
+#
+#   python benchmarks/stages.py --sizes 50,100,200,400 [--max-exponent 1.3] [--json results.json]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    os.path.join(REPO_ROOT, 'boolean-expression-types'),
+    os.path.join(REPO_ROOT, 'aggregate-expression-types'),
+    os.path.join(REPO_ROOT, 'hml-common'),
+    os.path.dirname(os.path.abspath(__file__)),
+]
+
+from synthetic_project import generate_project
+from boolean_expression_types import main as boolean_main
+from hml_common.metadata_index import MetadataIndex
+from aggregate_expression_types import main as aggregate_main
+
+# Stages shorter than this at the largest size are too noisy to judge scaling on
+NOISE_FLOOR_SECONDS = 0.005
+
+def timed(timings: Dict[str, float], stage: str, function: Callable[[], Any]) -> Any:
+    started = time.perf_counter()
+    result = function()
+    timings[stage] = time.perf_counter() - started
+    return result
+
+def run_boolean_stages(project: Dict[str, Any], timings: Dict[str, float]) -> None:
+    root = project['root']
+    hml_files = timed(timings, 'bool: file discovery', lambda: boolean_main.read_all_hml_files(root))
+    parsed_files = timed(timings, 'bool: parse', lambda: boolean_main.parse_hml_files(hml_files))
+    object_types, scalar_representations, data_connector_links, subgraph_name, data_connector_names = timed(
+        timings, 'bool: extract_types', lambda: boolean_main.extract_types(MetadataIndex.from_parsed_files(parsed_files))
+    )
+    matched_object_types = timed(timings, 'bool: match_object_types', lambda: boolean_main.match_object_types(object_types, data_connector_links))
+    boolean_expression_types = timed(timings, 'bool: generate_boolean_expression_types', lambda: boolean_main.generate_boolean_expression_types(
+        matched_object_types, scalar_representations, data_connector_links, subgraph_name, data_connector_names
+    ))
+    filter_expression_types = boolean_main.build_filter_expression_index(boolean_expression_types)
+    timed(timings, 'bool: process_hml_file', lambda: [
+        boolean_main.process_hml_file(hml_files[filename], filter_expression_types, parsed_files[filename])
+        for filename in boolean_main.files_to_rewrite(hml_files, False)
+    ])
+    timed(timings, 'bool: write_new_hml_file', lambda: boolean_main.write_new_hml_file(boolean_expression_types, os.path.join(root, 'bool_exps.hml')))
+
+def run_aggregate_stages(project: Dict[str, Any], timings: Dict[str, float]) -> None:
+    connectors = timed(timings, 'agg: load_connector', lambda: [
+        aggregate_main.load_connector(subgraph['link_file'], subgraph['types_file']) for subgraph in project['subgraphs']
+    ])
+
+    def generate_scalar_expressions():
+        for connector in connectors:
+            connector['scalar_aggregate_expressions'] = aggregate_main.generate_scalar_aggregate_expressions(connector['scalar_types'], connector['scalar_representations'], connector['name'])
+            connector['aggregatable_scalars'] = aggregate_main.build_aggregatable_scalar_index(connector['scalar_types'])
+        aggregate_main.resolve_aggregate_expression_names(connectors)
+    timed(timings, 'agg: generate_scalar_aggregate_expressions', generate_scalar_expressions)
+
+    model_files = [model_file for subgraph in project['subgraphs'] for model_file in subgraph['model_files']]
+    timed(timings, 'agg: process_model_files', lambda: aggregate_main.process_model_files(
+        model_files,
+        connectors[0]['scalar_types'],
+        connectors[0]['scalar_representations'],
+        connectors[0]['aggregatable_scalars'],
+        {connector['name']: connector for connector in connectors}
+    ))
+
+def run_size(size: int, args: argparse.Namespace) -> Dict[str, float]:
+    # Best of args.repeat runs per stage, each on a freshly generated project
+    best = {}
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory(prefix='hml-bench-') as root:
+            project = generate_project(
+                root, args.subgraphs, size, args.fields, args.depth,
+                max(1, int(size * args.model_ratio)), args.scalar_types, args.types_per_file
+            )
+            timings = {}
+            run_boolean_stages(project, timings)
+            run_aggregate_stages(project, timings)
+        for stage, seconds in timings.items():
+            best[stage] = min(best.get(stage, seconds), seconds)
+    return best
+
+def scaling_exponent(sizes: List[int], seconds: List[float]) -> float:
+    # Growth of time with size between the smallest and largest run: 1.0 is linear, 2.0 quadratic
+    if seconds[0] <= 0 or sizes[-1] == sizes[0]:
+        return 0.0
+    return math.log(seconds[-1] / seconds[0]) / math.log(sizes[-1] / sizes[0])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each stage of both generators on synthetic projects of increasing size.")
+    parser.add_argument('--sizes', default='50,100,200,400', help="Comma-separated ObjectTypes per subgraph to run (default: %(default)s)")
+    parser.add_argument('--subgraphs', type=int, default=2, help="Number of subgraphs (default: %(default)s)")
+    parser.add_argument('--fields', type=int, default=8, help="Scalar fields per ObjectType (default: %(default)s)")
+    parser.add_argument('--depth', type=int, default=2, help="Nesting depth of ObjectTypes (default: %(default)s)")
+    parser.add_argument('--model-ratio', type=float, default=0.5, help="Share of ObjectTypes that get a Model (default: %(default)s)")
+    parser.add_argument('--scalar-types', type=int, default=6, help="Scalar types per connector (default: %(default)s)")
+    parser.add_argument('--types-per-file', type=int, default=1, help="ObjectTypes per metadata file (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the fastest time of each stage is kept (default: %(default)s)")
+    parser.add_argument('--json', help="Also write the timings and scaling exponents to this JSON file")
+    parser.add_argument('--max-exponent', type=float, help="Exit with status 1 when a stage scales worse than size^N")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    logging.disable(logging.WARNING)  # The generators log every file, and synthetic connectors share scalar names
+
+    results = {}
+    for size in sizes:
+        print(f"Running size {size} ({size * args.subgraphs} ObjectTypes)...", file=sys.stderr)
+        results[size] = run_size(size, args)
+
+    stages = list(results[sizes[0]])
+    exponents = {stage: scaling_exponent(sizes, [results[size][stage] for size in sizes]) for stage in stages}
+
+    header = f"{'stage':<44}" + ''.join(f"{size:>10}" for size in sizes) + f"{'exponent':>10}"
+    print(header)
+    print('-' * len(header))
+    for stage in stages:
+        print(f"{stage:<44}" + ''.join(f"{results[size][stage] * 1000:10.1f}" for size in sizes) + f"{exponents[stage]:10.2f}")
+    print("(milliseconds per stage; exponent is the growth of time with size, 1.00 = linear)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'parameters': {key: value for key, value in vars(args).items() if key not in ('json', 'max_exponent')},
+                'sizes': sizes,
+                'seconds': {stage: {str(size): results[size][stage] for size in sizes} for stage in stages},
+                'exponents': exponents,
+            }, f, indent=2)
+
+    if args.max_exponent is not None:
+        too_slow = [
+            stage for stage in stages
+            if exponents[stage] > args.max_exponent and results[sizes[-1]][stage] >= NOISE_FLOOR_SECONDS
+        ]
+        if too_slow:
+            print(f"Stages scaling worse than size^{args.max_exponent}: {', '.join(too_slow)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from typing import List, Optional, Tuple
+
+# Measures cold-start time of both generators: the Python entry points and, when they have been built
+# with package_script.py, the --onefile and --onedir executables.
+#
+#   python benchmarks/startup.py [--runs 20] [--args=--help]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TOOLS = [
+    ('boolean-expression-types', 'boolean_expression_types', 'boolean-generator'),
+    ('aggregate-expression-types', 'aggregate_expression_types', 'aggregate-generator'),
+]
+
+def startup_commands(cli_args: List[str]) -> List[Tuple[str, List[str], str]]:
+    # (label, command, working directory) for every variant that exists
+    commands = []
+    for tool_dir, package, executable in TOOLS:
+        cwd = os.path.join(REPO_ROOT, tool_dir)
+        commands.append((f"{executable} (python -m)", [sys.executable, '-m', f'{package}.main'] + cli_args, cwd))
+        suffix = '.exe' if os.name == 'nt' else ''
+        onefile = os.path.join(cwd, 'dist', f'{executable}{suffix}')
+        onedir = os.path.join(cwd, 'dist', 'onedir', executable, f'{executable}{suffix}')
+        if os.path.isfile(onefile):
+            commands.append((f"{executable} (--onefile)", [onefile] + cli_args, cwd))
+        if os.path.isfile(onedir):
+            commands.append((f"{executable} (--onedir)", [onedir] + cli_args, cwd))
+    return commands
+
+def time_command(command: List[str], cwd: str, runs: int, warmup: int) -> Optional[List[float]]:
+    timings = []
+    for i in range(warmup + runs):
+        started = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            return None
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup time of the generator CLIs and packaged executables.")
+    parser.add_argument('--runs', type=int, default=20, help="Timed runs per command (default: %(default)s)")
+    parser.add_argument('--warmup', type=int, default=2, help="Untimed runs per command before measuring (default: %(default)s)")
+    parser.add_argument('--args', default='--help', help="Arguments passed to every command (default: %(default)s)")
+    args = parser.parse_args()
+
+    # The entry points import the shared hml-common helpers, which are importable without `poetry install` this way
+    os.environ['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.join(REPO_ROOT, 'hml-common'), os.environ.get('PYTHONPATH')]))
+
+    print(f"{'command':<42} {'min ms':>8} {'median ms':>10} {'max ms':>8}")
+    for label, command, cwd in startup_commands(args.args.split()):
+        timings = time_command(command, cwd, args.runs, args.warmup)
+        if timings is None:
+            print(f"{label:<42} {'failed':>8}")
+            continue
+        print(f"{label:<42} {min(timings):8.1f} {statistics.median(timings):10.1f} {max(timings):8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import os
+import argparse
+from typing import Any, Dict, List
+
+# Builds a synthetic supergraph project shaped like the ones the generators run on: per subgraph a
+# Connector, a DataConnectorLink with its scalar and object types, the DataConnectorScalarRepresentations
+# in a `-types.hml` file, and ObjectTypes (some with ObjectBooleanExpressionTypes and Models) spread over
+# metadata files. ObjectType and Model descriptions hold a `---` line inside a block scalar, which must
+# not be taken for a document separator.
+#
+#   python benchmarks/synthetic_project.py /tmp/project --subgraphs 4 --object-types 200 --models 100
+
+SCALAR_TYPES = ['int4', 'int8', 'text', 'bool', 'float8', 'numeric', 'timestamp', 'date', 'uuid', 'jsonb']
+AGGREGATABLE_SCALAR_TYPES = {'int4', 'int8', 'float8', 'numeric'}
+
+GRAPHQL_CONFIG = """kind: GraphqlConfig
+version: v1
+definition:
+  query:
+    rootOperationTypeName: Query
+    argumentsInput:
+      fieldName: args
+  mutation:
+    rootOperationTypeName: Mutation
+"""
+
+def scalar_type_names(count: int) -> List[str]:
+    return SCALAR_TYPES[:count] + [f"custom_{i}" for i in range(count - len(SCALAR_TYPES))]
+
+def representation_name(scalar_type: str) -> str:
+    return ''.join(part.capitalize() for part in scalar_type.split('_'))
+
+def object_type_name(subgraph: int, index: int) -> str:
+    return f"Sub{subgraph}Type{index}"
+
+def connector_object_type_name(subgraph: int, index: int) -> str:
+    return f"sub{subgraph}_type{index}"
+
+def object_type_fields(index: int, fields: int, depth: int, scalars: List[str], object_types: int) -> List[Any]:
+    # (field name, scalar type or None, nested object type index or None). Types form chains of `depth`
+    # ObjectTypes, each one holding the next as a field, so boolean expressions nest `depth` levels deep.
+    result = [(f"field_{i}", scalars[i % len(scalars)], None) for i in range(fields)]
+    if depth > 1 and (index + 1) % depth != 0 and index + 1 < object_types:
+        result.append(('child', None, index + 1))
+    return result
+
+def data_connector_link(subgraph: int, connector: str, scalars: List[str], object_types: int, fields: int, depth: int) -> str:
+    lines = [
+        'kind: DataConnectorLink',
+        'version: v1',
+        'definition:',
+        f'  name: {connector}',
+        '  url:',
+        '    readWriteUrls:',
+        '      read:',
+        f'        valueFromEnv: {connector.upper()}_READ_URL',
+        '      write:',
+        f'        valueFromEnv: {connector.upper()}_WRITE_URL',
+        '  schema:',
+        '    version: v0.1',
+        '    schema:',
+        '      scalar_types:',
+    ]
+    for scalar in scalars:
+        lines += [f'        {scalar}:', '          representation:', '            type: string']
+        if scalar in AGGREGATABLE_SCALAR_TYPES:
+            lines.append('          aggregate_functions:')
+            for function, result in (('avg', 'float8'), ('max', scalar), ('min', scalar), ('sum', scalar)):
+                lines += [
+                    f'            {function}:',
+                    '              result_type:',
+                    '                type: nullable',
+                    '                underlying_type:',
+                    '                  type: named',
+                    f'                  name: {result}',
+                ]
+        else:
+            lines.append('          aggregate_functions: {}')
+        lines += ['          comparison_operators:', '            _eq:', '              type: equal']
+        for operator in ('_gt', '_gte', '_lt', '_lte', '_neq'):
+            lines += [
+                f'            {operator}:',
+                '              type: custom',
+                '              argument_type:',
+                '                type: named',
+                f'                name: {scalar}',
+            ]
+    lines.append('      object_types:')
+    for index in range(object_types):
+        lines += [f'        {connector_object_type_name(subgraph, index)}:', '          fields:']
+        for name, scalar, child in object_type_fields(index, fields, depth, scalars, object_types):
+            lines += [
+                f'            {name}:',
+                '              type:',
+                '                type: named',
+                f'                name: {scalar or connector_object_type_name(subgraph, child)}',
+            ]
+    lines += [
+        '      collections: []',
+        '      functions: []',
+        '      procedures: []',
+        '    capabilities:',
+        '      version: 0.1.5',
+        '      capabilities:',
+        '        query:',
+        '          aggregates: {}',
+        '          variables: {}',
+        '        mutation: {}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+def scalar_representations(connector: str, scalars: List[str]) -> str:
+    documents = []
+    for scalar in scalars:
+        name = representation_name(scalar)
+        documents.append(f"""kind: ScalarType
+version: v1
+definition:
+  name: {name}
+  graphql:
+    typeName: {name}
+""")
+        documents.append(f"""kind: DataConnectorScalarRepresentation
+version: v1
+definition:
+  dataConnectorName: {connector}
+  dataConnectorScalarType: {scalar}
+  representation: {name}
+  graphql:
+    comparisonExpressionTypeName: {name}ComparisonExp
+""")
+    return '---\n' + '\n---\n'.join(documents)
+
+def object_type_documents(subgraph: int, connector: str, index: int, fields: List[Any], with_model: bool) -> List[str]:
+    name = object_type_name(subgraph, index)
+    field_lines = ''.join(
+        f"    - name: {field}\n      type: {representation_name(scalar) if scalar else object_type_name(subgraph, child)}{'!' if field == 'field_0' else ''}\n"
+        for field, scalar, child in fields
+    )
+    allowed_fields = ''.join(f"          - {field}\n" for field, _, _ in fields)
+    documents = [
+        f"""kind: ObjectType
+version: v1
+definition:
+  name: {name}
+  description: |
+    Rows of {connector_object_type_name(subgraph, index)}.
+    ---
+    Generated for benchmarking.
+  fields:
+{field_lines}  graphql:
+    typeName: {name}
+    inputTypeName: {name}Input
+  dataConnectorTypeMapping:
+    - dataConnectorName: {connector}
+      dataConnectorObjectType: {connector_object_type_name(subgraph, index)}
+""",
+        f"""kind: TypePermissions
+version: v1
+definition:
+  typeName: {name}
+  permissions:
+    - role: admin
+      output:
+        allowedFields:
+{allowed_fields}""",
+    ]
+    if with_model:
+        documents += [
+            f"""kind: ObjectBooleanExpressionType
+version: v1
+definition:
+  name: {name}BoolExp
+  objectType: {name}
+  dataConnectorName: {connector}
+  dataConnectorObjectType: {connector_object_type_name(subgraph, index)}
+""",
+            f"""kind: Model
+version: v1
+definition:
+  name: {name}
+  objectType: {name}
+  description: |
+    ---
+    Model over {connector_object_type_name(subgraph, index)}.
+  source:
+    dataConnectorName: {connector}
+    collection: {connector_object_type_name(subgraph, index)}
+  filterExpressionType: {name}BoolExp
+  orderableFields:
+    - fieldName: field_0
+      orderByDirections:
+        enableAll: true
+  graphql:
+    selectMany:
+      queryRootField: {connector_object_type_name(subgraph, index)}
+    selectUniques: []
+    orderByExpressionType: {name}OrderBy
+""",
+            f"""kind: ModelPermissions
+version: v1
+definition:
+  modelName: {name}
+  permissions:
+    - role: admin
+      select:
+        filter: null
+""",
+        ]
+    return documents
+
+def write_file(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+def generate_project(root: str, subgraphs: int = 2, object_types: int = 50, fields: int = 8, depth: int = 2,
+                     models: int = 25, scalar_types: int = 6, types_per_file: int = 1) -> Dict[str, Any]:
+    """
+    Write a synthetic project under root. object_types, models and scalar_types are per subgraph;
+    types_per_file groups several ObjectTypes (with their Models) into one file to control file size.
+    Returns the paths the generators need: for every subgraph its connector link, types file and model files.
+    """
+    scalars = scalar_type_names(scalar_types)
+    project = {'root': root, 'graphql_config': os.path.join(root, 'globals', 'metadata', 'graphql-config.hml'), 'subgraphs': []}
+    write_file(project['graphql_config'], GRAPHQL_CONFIG)
+
+    for subgraph in range(subgraphs):
+        subgraph_name = f"sub{subgraph}"
+        connector = f"db{subgraph}"
+        metadata_dir = os.path.join(root, subgraph_name, 'metadata')
+        write_file(os.path.join(root, subgraph_name, 'connector', connector, 'connector.hml'), f"""kind: Connector
+version: v1
+definition:
+  name: {connector}
+  subgraph: {subgraph_name}
+  source: hasura/postgres:v1.0.0
+  context: .
+""")
+        link_file = os.path.join(metadata_dir, f"{connector}.hml")
+        types_file = os.path.join(metadata_dir, f"{connector}-types.hml")
+        write_file(link_file, data_connector_link(subgraph, connector, scalars, object_types, fields, depth))
+        write_file(types_file, scalar_representations(connector, scalars))
+
+        model_files = []
+        for start in range(0, object_types, types_per_file):
+            documents = []
+            for index in range(start, min(start + types_per_file, object_types)):
+                type_fields = object_type_fields(index, fields, depth, scalars, object_types)
+                documents += object_type_documents(subgraph, connector, index, type_fields, index < models)
+            file_path = os.path.join(metadata_dir, f"{object_type_name(subgraph, start)}.hml")
+            write_file(file_path, '---\n' + '\n---\n'.join(documents))
+            if start < models:
+                model_files.append(file_path)
+
+        project['subgraphs'].append({
+            'name': subgraph_name,
+            'connector': connector,
+            'link_file': link_file,
+            'types_file': types_file,
+            'model_files': model_files,
+        })
+
+    return project
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--subgraphs', type=int, default=2, help="Number of subgraphs, each with its own connector (default: %(default)s)")
+    parser.add_argument('--object-types', type=int, default=50, help="ObjectTypes per subgraph (default: %(default)s)")
+    parser.add_argument('--fields', type=int, default=8, help="Scalar fields per ObjectType (default: %(default)s)")
+    parser.add_argument('--depth', type=int, default=2, help="Nesting depth of ObjectTypes referring to each other (default: %(default)s)")
+    parser.add_argument('--models', type=int, default=25, help="ObjectTypes per subgraph that get a Model (default: %(default)s)")
+    parser.add_argument('--scalar-types', type=int, default=6, help="Scalar types per connector (default: %(default)s)")
+    parser.add_argument('--types-per-file', type=int, default=1, help="ObjectTypes written to each metadata file (default: %(default)s)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic supergraph project for benchmarking the generators.")
+    parser.add_argument('root', help="Directory to write the project to")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    project = generate_project(args.root, args.subgraphs, args.object_types, args.fields, args.depth, args.models, args.scalar_types, args.types_per_file)
+    file_count = sum(len(files) for _, _, files in os.walk(args.root))
+    print(f"Wrote {file_count} files for {len(project['subgraphs'])} subgraphs to {args.root}")
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
 
 
 a = Analysis(
     ['boolean_expression_types/main.py'],
-    pathex=['/home/codedmart/.cache/pypoetry/virtualenvs/boolean-expression-types-VPI7-kHy-py3.12/lib/python3.12/site-packages'],
+    pathex=['/home/codedmart/.cache/pypoetry/virtualenvs/boolean-expression-types-VPI7-kHy-py3.12/lib/python3.12/site-packages', os.path.join(SPECPATH, '..', 'hml-common')],
     binaries=[],
     datas=[('boolean_expression_types', 'boolean_expression_types')],
     hiddenimports=['ruamel.yaml', 'ruamel.yaml.constructor', 'ruamel.yaml.representer', 'ruamel.yaml.resolver'],
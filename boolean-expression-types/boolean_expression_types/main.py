@@ -1,47 +1,168 @@
 import os
 import argparse
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
 import re
 import logging
 import json
-from ruamel.yaml import YAML
 import io
 import traceback
 import sys
-
-yaml = YAML()
-yaml.default_flow_style = False
-yaml.preserve_quotes = True
-yaml.indent(mapping=2, sequence=4, offset=2)
-yaml.preserve_null = True
-yaml.width = 4096
-yaml.representer.add_representer(type(None), lambda self, data: self.represent_scalar('tag:yaml.org,2002:null', 'null'))
+import shutil
+import uuid
+import time
+from hml_common.parse_cache import Content, ParseCache, DEFAULT_MAX_CACHE_BYTES
+from hml_common.lazy_yaml import LazyYAML
+from hml_common.metrics import RunMetrics
+from boolean_expression_types import __version__
+from hml_common.fast_emitter import emit_document
+from hml_common.document_splitter import document_separators, iter_documents, mapped_file, mapping_loader
+from hml_common.metadata_index import MetadataIndex, normalize_name
+from hml_common.lazy_documents import RawDocument, load_documents
+from hml_common.project_walker import ProjectWalker, DEFAULT_EXCLUDE, DEFAULT_READ_THREADS, read_text_files, split_patterns
+
+def create_round_trip_yaml():
+    from ruamel.yaml import YAML
+    yaml = YAML()
+    yaml.default_flow_style = False
+    yaml.preserve_quotes = True
+    yaml.indent(mapping=2, sequence=4, offset=2)
+    yaml.preserve_null = True
+    yaml.width = 4096
+    yaml.representer.add_representer(type(None), lambda self, data: self.represent_scalar('tag:yaml.org,2002:null', 'null'))
+    return yaml
+
+def create_read_only_yaml():
+    from hml_common.fast_loader import create_fast_yaml
+    return create_fast_yaml()
+
+# ruamel.yaml is only imported once a file is actually loaded or dumped, so the CLI starts quickly
+yaml = LazyYAML(create_round_trip_yaml)
+
+# Loader for files that are read but never rewritten
+fast_yaml = LazyYAML(create_read_only_yaml)
+
+# Files read from the project unless --include says otherwise
+DEFAULT_INCLUDE = ('*.hml', '*.yaml', '*.yml')
+
+# Kinds generation reads; --streaming keeps only compact copies of these between its two passes
+GENERATION_KINDS = ('ObjectType', 'DataConnectorScalarRepresentation', 'DataConnectorLink', 'Connector')
+
+# Kinds parsed with --lazy-load: those generation reads and those process_hml_file changes. Documents of
+# any other kind stay raw text and are written back unchanged.
+LOADED_KINDS = frozenset(GENERATION_KINDS + ('Model', 'ObjectBooleanExpressionType'))
+
+# Top-level kinds that process_hml_file changes; files without them need no round-trip load in fast mode
+REWRITTEN_KINDS_PATTERN = re.compile(r'^kind:\s*["\']?(?:Model|ObjectBooleanExpressionType)["\']?\s*(?:#.*)?$', re.MULTILINE)
+REWRITTEN_KINDS_BYTES_PATTERN = re.compile(REWRITTEN_KINDS_PATTERN.pattern.encode('utf-8'), re.MULTILINE)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Stage timings and I/O counters of the run, written out with --metrics
+metrics = RunMetrics('boolean-expression-types')
+
 def log_error_with_line_number(error_message):
     exc_type, exc_value, exc_traceback = sys.exc_info()
     line_number = traceback.extract_tb(exc_traceback)[-1][1]
     logger.error(f"{error_message} (Line {line_number})")
 
-def read_all_hml_files(directory: str) -> Dict[str, str]:
+def project_walker(include: Optional[List[str]] = None, exclude: Optional[List[str]] = None, use_gitignore: bool = True) -> ProjectWalker:
+    return ProjectWalker(include or DEFAULT_INCLUDE, DEFAULT_EXCLUDE if exclude is None else exclude, use_gitignore)
+
+def read_all_hml_files(directory: str, walker: Optional[ProjectWalker] = None, threads: int = DEFAULT_READ_THREADS) -> Dict[str, str]:
+    # Excluded and git-ignored directories are pruned without being listed; the files are read by a thread pool
     hml_files = {}
-    for root, dirs, files in os.walk(directory):
-        # Skip node_modules directories
-        if 'node_modules' in dirs:
-            dirs.remove('node_modules')
-        for filename in files:
-            if filename.endswith('.hml') or filename.endswith('.yaml') or filename.endswith('.yml'):
-                file_path = os.path.join(root, filename)
-                try:
-                    with open(file_path, 'r') as file:
-                        hml_files[file_path] = file.read()
-                except Exception as e:
-                    logger.warning(f"Error reading file {file_path}: {str(e)}")
+    for file_path, content, size, error in read_text_files((walker or project_walker()).walk(directory), threads):
+        if error is not None:
+            logger.warning(f"Error reading file {file_path}: {error}")
+            continue
+        hml_files[file_path] = content
+        metrics.count('files_read')
+        metrics.count('bytes_read', size)
     return hml_files
 
-def parse_hml_content(content: str, filename: str) -> List[Dict[str, Any]]:
+def scan_hml_files(directory: str, walker: Optional[ProjectWalker] = None) -> Dict[str, Tuple[int, int]]:
+    # Same files as read_all_hml_files, but only stat them: path -> (mtime_ns, size)
+    snapshot = {}
+    for file_path in (walker or project_walker()).walk(directory):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            continue
+        snapshot[file_path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def write_if_changed(file_path: str, content: str) -> bool:
+    # Leave the file (and its mtime) untouched when the rendered content matches what is on disk
+    try:
+        with open(file_path, 'r', newline='') as file:
+            if file.read() == content.replace('\n', os.linesep):
+                metrics.count('files_unchanged')
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+
+    # Write to a temp file in the same directory and rename it over the target so readers never see a partial file
+    directory, basename = os.path.split(os.path.abspath(file_path))
+    tmp_path = os.path.join(directory, f".{basename}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), 'w') as file:
+            file.write(content)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    metrics.count('files_written')
+    metrics.count('bytes_written', len(content.encode('utf-8')))
+    return True
+
+def needs_round_trip(filename: str, content: Content) -> bool:
+    # Only .hml files holding Models or ObjectBooleanExpressionTypes are changed by the rewrite stage
+    pattern = REWRITTEN_KINDS_PATTERN if isinstance(content, str) else REWRITTEN_KINDS_BYTES_PATTERN
+    return filename.endswith('.hml') and pattern.search(content) is not None
+
+def fast_load_document(document: str) -> Any:
+    # DataConnectorLinks only contribute their schema sections, so stream those out and skip the rest
+    from hml_common.connector_schema import extract_data_connector_link, is_data_connector_link
+    if is_data_connector_link(document):
+        try:
+            link = extract_data_connector_link(document)
+            if link is not None:
+                return link
+        except Exception as e:
+            logger.debug(f"Streaming DataConnectorLink extraction failed, loading the whole document: {str(e)}")
+    return fast_yaml.load(document)
+
+def parse_variant(fast: bool, lazy: bool) -> str:
+    # Parse cache variant of the documents a combination of loaders produces
+    return ('fast' if fast else '') + ('-lazy' if lazy else '')
+
+def load_hml_documents(content: Content, load: Callable[[str], Any], lazy: bool = False) -> List[Any]:
+    load = mapping_loader(load)
+    if lazy:
+        # Only documents of LOADED_KINDS are parsed; the rest are kept as RawDocuments
+        return load_documents(iter_documents(content), load, LOADED_KINDS)
+    return [load(document) for document in iter_documents(content)]
+
+def parse_hml_content(content: Content, filename: str, fast: bool = False, lazy: bool = False) -> List[Any]:
+    # Load each document on its own so the result can be fed straight into process_hml_file.
+    # content is the text of the file or its memory-mapped bytes, which are decoded one document at a time.
+    if fast:
+        try:
+            return load_hml_documents(content, fast_load_document, lazy)
+        except Exception as e:
+            # e.g. custom tags the safe loader does not know; the round-trip loader below reports real errors
+            logger.debug(f"Fast load failed for {filename}, falling back to round-trip: {str(e)}")
+    try:
+        return load_hml_documents(content, yaml.load, lazy)
+    except Exception as e:
+        # e.g. `--- !tag` or `...` markers, which the splitter leaves inside documents; load_all handles them
+        logger.debug(f"Loading {filename} document by document failed, loading it as one stream: {str(e)}")
+    if not isinstance(content, str):
+        content = content[:].decode('utf-8').replace('\r\n', '\n')
     try:
         return list(yaml.load_all(content))
     except Exception as e:
@@ -49,10 +170,143 @@ def parse_hml_content(content: str, filename: str) -> List[Dict[str, Any]]:
         snippet = '\n'.join(content.split('\n')[:5])  # First 5 lines of the file
         raise ValueError(f"Error parsing YAML in file {filename}:\n{str(e)}\nFile snippet:\n{snippet}")
 
-def normalize_name(name: str) -> str:
-    # Remove any non-alphanumeric characters and convert to lowercase
-    normalized = re.sub(r'[^a-zA-Z0-9]', '', name).lower()
-    return normalized
+def _parse_hml_item(item: Tuple[str, str, bool, bool]) -> List[Any]:
+    filename, content, fast, lazy = item
+    return parse_hml_content(content, filename, fast, lazy)
+
+def parse_hml_files(hml_files: Dict[str, str], jobs: int = 1, cache: Optional[ParseCache] = None, fast_load: bool = False, lazy_load: bool = False) -> Dict[str, List[Any]]:
+    # Serve unchanged files from the parse cache and only send the rest through ruamel.
+    # With fast_load, files the rewrite stage will not touch are read with the fast loader.
+    # With lazy_load, documents of kinds the tool does not read are not parsed at all.
+    parsed_files = {}
+    to_parse = []
+    for filename, content in hml_files.items():
+        fast = fast_load and not needs_round_trip(filename, content)
+        documents = cache.get(filename, content, parse_variant(fast, lazy_load)) if cache else None
+        if documents is None:
+            to_parse.append((filename, content, fast, lazy_load))
+        else:
+            parsed_files[filename] = documents
+
+    # Parse sequentially unless a worker pool is requested; results keep the input file order either way
+    if jobs <= 1 or len(to_parse) < 2:
+        for item in to_parse:
+            parsed_files[item[0]] = _parse_hml_item(item)
+    else:
+        chunksize = max(1, len(to_parse) // (jobs * 4))
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            # executor.map yields in submission order and re-raises a worker's ValueError unchanged
+            results = executor.map(_parse_hml_item, to_parse, chunksize=chunksize)
+            parsed_files.update(zip((item[0] for item in to_parse), results))
+
+    if cache:
+        for filename, content, fast, lazy in to_parse:
+            cache.put(filename, content, parsed_files[filename], parse_variant(fast, lazy))
+
+    return {filename: parsed_files[filename] for filename in hml_files}
+
+def compact_document(document: Any) -> Optional[Dict[str, Any]]:
+    # Keep only what extract_types and generation read from a document, or None when its kind is not needed:
+    # ObjectType names and field names/types, the DataConnectorLink schema types, and the small
+    # Connector and DataConnectorScalarRepresentation definitions
+    kind = document.get('kind') if isinstance(document, dict) else None
+    if kind not in GENERATION_KINDS:
+        return None
+    definition = document.get('definition')
+    if not isinstance(definition, dict):
+        return {'kind': kind}
+    if kind == 'ObjectType':
+        compact = {key: definition[key] for key in ('name', 'fields') if key in definition}
+        if isinstance(compact.get('fields'), list):
+            compact['fields'] = [{key: field[key] for key in ('name', 'type') if key in field} for field in compact['fields']]
+    elif kind == 'DataConnectorLink':
+        compact = {key: definition[key] for key in ('name',) if key in definition}
+        schema = (definition.get('schema') or {}).get('schema')
+        if isinstance(schema, dict):
+            compact['schema'] = {'schema': {key: schema[key] for key in ('object_types', 'scalar_types') if key in schema}}
+    else:
+        compact = definition
+    return {'kind': kind, 'definition': compact}
+
+# Parse cache used by streaming scan workers, set once per worker process
+_scan_cache: Optional[ParseCache] = None
+
+def _set_scan_cache(cache: Optional[ParseCache]) -> None:
+    global _scan_cache
+    _scan_cache = cache
+
+def _scan_hml_item(item: Tuple[str, bool, bool]) -> Tuple[str, Optional[int], List[Dict[str, Any]], Dict[str, int], bool, Optional[bool], Optional[str]]:
+    # First streaming pass over one file. Returns (filename, bytes read or None if unreadable, compact documents,
+    # documents by kind, whether the file is rewritten, whether it came from the parse cache, error)
+    filename, fast_load, lazy_load = item
+    try:
+        with mapped_file(filename) as content:
+            # The file is memory-mapped and only one document at a time is decoded from it
+            size = len(content)
+            round_trip = needs_round_trip(filename, content)
+            fast = fast_load and not round_trip
+            rewrite = filename.endswith('.hml') and (not fast_load or round_trip)
+            variant = parse_variant(fast, lazy_load)
+            documents = _scan_cache.get(filename, content, variant) if _scan_cache else None
+            cached = documents is not None if _scan_cache else None
+            if documents is None:
+                try:
+                    documents = parse_hml_content(content, filename, fast, lazy_load)
+                except ValueError as e:
+                    return filename, size, [], {}, False, cached, str(e)
+                if _scan_cache:
+                    _scan_cache.put(filename, content, documents, variant)
+    except OSError as e:
+        return filename, None, [], {}, False, None, str(e)
+
+    documents_by_kind = {}
+    for document in documents:
+        if isinstance(document, dict):
+            kind = str(document.get('kind'))
+            documents_by_kind[kind] = documents_by_kind.get(kind, 0) + 1
+    compact = [document for document in map(compact_document, documents) if document is not None]
+    return filename, size, compact, documents_by_kind, rewrite, cached, None
+
+def scan_hml_files_streaming(filenames: List[str], jobs: int = 1, cache: Optional[ParseCache] = None, fast_load: bool = False, lazy_load: bool = False) -> Optional[Tuple[Dict[str, List[Dict[str, Any]]], List[str]]]:
+    # First pass of --streaming: read and parse the files one at a time, across a worker pool when jobs > 1,
+    # and keep only the compact documents generation needs. Returns (compact documents by file, files to
+    # rewrite), or None after logging the first parse error, like a normal run stops on one.
+    items = [(filename, fast_load, lazy_load) for filename in filenames]
+    if jobs <= 1 or len(items) < 2:
+        _set_scan_cache(cache)
+        results = map(_scan_hml_item, items)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_set_scan_cache, initargs=(cache,))
+        results = executor.map(_scan_hml_item, items, chunksize=max(1, len(items) // (jobs * 4)))
+
+    parsed_files = {}
+    rewrite_filenames = []
+    try:
+        for filename, size, compact, documents_by_kind, rewrite, cached, error in results:
+            if size is None:
+                logger.warning(f"Error reading file {filename}: {error}")
+                continue
+            metrics.merge({'files_read': 1, 'bytes_read': size}, documents_by_kind)
+            if executor and cache and cached is not None:
+                # Workers count into their own copy of the cache
+                if cached:
+                    cache.hits += 1
+                else:
+                    cache.misses += 1
+            if error is not None:
+                logger.error(error)
+                return None
+            parsed_files[filename] = compact
+            if rewrite:
+                rewrite_filenames.append(filename)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    return parsed_files, rewrite_filenames
 
 def cap(string):
     if string is None:
@@ -75,29 +329,24 @@ def sanitize_name(name: str) -> str:
     # If the name is empty after sanitization, use a default name
     return sanitized if sanitized else '_Unknown'
 
-def process_hml_file(content: str, boolean_exp_types: List[Dict[str, Any]]) -> str:
-    # Split the content into documents while preserving original separators
-    documents = []
-    separators = []
-    current_doc = ""
-    for line in content.splitlines(True):  # Keep the newlines
-        if line.strip() == "---":
-            if current_doc:
-                documents.append(yaml.load(current_doc))
-                separators.append(line)
-                current_doc = ""
-        else:
-            current_doc += line
-    if current_doc:
-        documents.append(yaml.load(current_doc))
+def process_hml_file(content: str, filter_expression_types: Dict[str, str], documents: Optional[List[Any]] = None) -> str:
+    # Reuse the documents parsed by parse_hml_content when available instead of loading the file again
+    if documents is None:
+        documents = parse_hml_content(content, '<content>')
+    separators = document_separators(content)
+    if len(separators) != len(documents) - 1:
+        # Documents loaded with load_all do not line up with the separators the splitter found
+        separators = ['---\n'] * (len(documents) - 1)
 
     # Process the documents
     processed_documents = []
     for doc in documents:
-        if doc.get('kind') == 'ObjectBooleanExpressionType':
+        if isinstance(doc, RawDocument):
+            pass  # Kept as written, lazy loading only leaves kinds this function does not change unparsed
+        elif doc.get('kind') == 'ObjectBooleanExpressionType':
             continue  # Skip this document
         elif doc.get('kind') == 'Model':
-            update_model_filter_expression_type(doc, boolean_exp_types)
+            update_model_filter_expression_type(doc, filter_expression_types)
         processed_documents.append(doc)
 
     # Reconstruct the content with original separators
@@ -106,64 +355,138 @@ def process_hml_file(content: str, boolean_exp_types: List[Dict[str, Any]]) -> s
     for i, doc in enumerate(processed_documents):
         if i > 0:
             output.write(separators[i-1])
-        yaml.dump(doc, output)
+        if isinstance(doc, RawDocument):
+            output.write(doc.text)
+        else:
+            yaml.dump(doc, output)
 
     return output.getvalue()
 
-def update_model_filter_expression_type(model: Dict[str, Any], boolean_exp_types: Dict[str, Any]):
+def build_filter_expression_index(boolean_exp_types: List[Dict[str, Any]]) -> Dict[str, str]:
+    # Map each operand object type to the name of its BooleanExpressionType, keeping the first one like the old scan did
+    filter_expression_types = {}
+    for bet in boolean_exp_types:
+        object_type = bet['definition']['operand'].get('object', {}).get('type')
+        if object_type:
+            filter_expression_types.setdefault(object_type, bet['definition']['name'])
+    return filter_expression_types
+
+def update_model_filter_expression_type(model: Dict[str, Any], filter_expression_types: Dict[str, str]):
     model_type = model.get('definition', {}).get('objectType')
-    if model_type:
-        for bet in boolean_exp_types:
-            if bet['definition']['operand'].get('object', {}).get('type') == model_type:
-                model['definition']['filterExpressionType'] = bet['definition']['name']
-                break
+    if model_type and model_type in filter_expression_types:
+        model['definition']['filterExpressionType'] = filter_expression_types[model_type]
+
+class TypeNameForms:
+    # Derived forms of one type name, computed once per distinct name by type_name_forms() and shared
+    __slots__ = ('normalized', 'capitalized', 'sanitized_capitalized', 'cleaned')
+
+    def __init__(self, name: str):
+        self.normalized = sys.intern(normalize_name(name))
+        self.capitalized = sys.intern(capitalize_object_type_name(name))
+        self.sanitized_capitalized = sys.intern(sanitize_name(self.capitalized))
+        self.cleaned = sys.intern(re.sub(r'[^a-z0-9]', '', name.lower()))
+
+# Type name -> its derived forms for the current run; type names repeat across fields and files.
+# extract_types clears it, so names of types deleted between --watch rounds do not pile up.
+_type_name_forms: Dict[str, TypeNameForms] = {}
+
+def type_name_forms(name: str) -> TypeNameForms:
+    forms = _type_name_forms.get(name)
+    if forms is None:
+        forms = _type_name_forms[str(name)] = TypeNameForms(name)
+    return forms
+
+class FieldRecord:
+    # name and type keep the loaded values, so quotes from the source survive into the generated fieldName
+    __slots__ = ('name', 'type', 'is_array', 'type_forms')
+
+    def __init__(self, name: str, field_type: str):
+        self.name = name
+        self.type = field_type
+        self.is_array = field_type.startswith('[') and field_type.endswith(']')
+        self.type_forms = type_name_forms(field_type)
+
+class ObjectTypeRecord:
+    __slots__ = ('name', 'sanitized_name', 'fields', 'file')
+
+    def __init__(self, name: str, fields: List[FieldRecord], file: str):
+        self.name = name
+        self.sanitized_name = sys.intern(sanitize_name(name))
+        self.fields = fields
+        self.file = file
+
+class ScalarRepresentationRecord:
+    # connector_name is None when the representation names no connector; mapping_connector_name is what
+    # the generated operator mapping says then
+    __slots__ = ('scalar_type', 'sanitized_scalar_type', 'representation', 'sanitized_representation', 'connector_name', 'mapping_connector_name')
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.scalar_type = definition['dataConnectorScalarType']
+        self.sanitized_scalar_type = sys.intern(sanitize_name(self.scalar_type))
+        self.representation = definition['representation']
+        self.sanitized_representation = sys.intern(sanitize_name(self.representation))
+        self.connector_name = definition.get('dataConnectorName')
+        self.mapping_connector_name = definition.get('dataConnectorName', 'unknown')
+
+def object_type_record(definition: Dict[str, Any], file: str) -> ObjectTypeRecord:
+    fields = []
+    for field in definition.get('fields') or []:
+        if isinstance(field, dict) and 'name' in field and isinstance(field.get('type'), str):
+            fields.append(FieldRecord(field['name'], field['type']))
+        else:
+            logger.debug(f"Problematic field in ObjectType {definition['name']}: {field}")
+    return ObjectTypeRecord(definition['name'], fields, file)
 
-def extract_types(parsed_files: Dict[str, List[Dict[str, Any]]]) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], str]:
+def extract_types(index: MetadataIndex) -> Tuple[Dict[str, ObjectTypeRecord], Dict[Tuple[Optional[str], str], ScalarRepresentationRecord], Dict[str, Any], str, Dict[str, str]]:
     object_types = {}
     scalar_representations = {}
     data_connector_links = {}
+    data_connector_names = {}
     subgraph_name = None
-
-    for filename, documents in parsed_files.items():
-        for doc in documents:
-            kind = doc.get('kind')
-            if kind == 'ObjectType':
-                try:
-                    name = doc['definition']['name']
-                    object_types[normalize_name(name)] = doc['definition']
-                except KeyError as e:
-                    logger.debug(f"Problematic document: {doc}")
-            elif kind == 'Connector':
-                subgraph_name = doc['definition'].get('subgraph')
-            elif kind == 'DataConnectorScalarRepresentation':
-                try:
-                    definition = doc['definition']
-                    data_connector_scalar_type = definition.get('dataConnectorScalarType')
-                    representation = definition.get('representation')
-                    if data_connector_scalar_type and representation:
-                        scalar_representations[data_connector_scalar_type] = definition
-                    else:
-                        logger.debug(f"Problematic document: {doc}")
-                except KeyError as e:
-                    logger.debug(f"Problematic document: {doc}")
-            elif kind == 'DataConnectorLink':
-                try:
-                    schema = doc['definition']['schema']['schema']
-                    data_connector_links[filename] = schema
-                    logger.debug(f"DataConnectorLink structure: {schema}")
-                except KeyError as e:
-                    logger.debug(f"Problematic document: {doc}")
-
-    return object_types, scalar_representations, data_connector_links, subgraph_name
-
-def find_matching_object_type(object_types, normalized_name): 
-    for ot, ot_info in object_types.items():
-        if normalize_name(ot) == normalized_name:
-            return ot
+    _type_name_forms.clear()
+
+    for entry in index.of_kind('ObjectType'):
+        doc = entry.document
+        try:
+            name = doc['definition']['name']
+            normalized_name = type_name_forms(name).normalized
+            if normalized_name in object_types:
+                # The later definition replaces the earlier one, so make the shadowing visible
+                shadowed = object_types[normalized_name]
+                logger.warning(f"ObjectType '{name}' in {entry.file} normalizes to the same name as '{shadowed.name}' in {shadowed.file} and shadows it")
+            object_types[normalized_name] = object_type_record(doc['definition'], entry.file)
+        except KeyError as e:
+            logger.debug(f"Problematic document: {doc}")
+
+    connectors = index.of_kind('Connector')
+    if connectors:
+        subgraph_name = connectors[-1].definition.get('subgraph')
+
+    for entry in index.of_kind('DataConnectorScalarRepresentation'):
+        definition = entry.definition
+        data_connector_scalar_type = definition.get('dataConnectorScalarType')
+        representation = definition.get('representation')
+        if data_connector_scalar_type and representation:
+            # Connectors may share scalar type names, so each connector keeps its own representation
+            scalar_representation = ScalarRepresentationRecord(definition)
+            scalar_representations[(scalar_representation.connector_name, data_connector_scalar_type)] = scalar_representation
         else:
-            None
-
-def match_object_types(object_types: Dict[str, Any], data_connector_links: Dict[str, Any]) -> Dict[str, Any]:
+            logger.debug(f"Problematic document: {entry.document}")
+
+    for entry in index.of_kind('DataConnectorLink'):
+        doc = entry.document
+        try:
+            schema = doc['definition']['schema']['schema']
+            data_connector_links[entry.file] = schema
+            data_connector_names[entry.file] = doc['definition'].get('name')
+            logger.debug(f"DataConnectorLink structure: {schema}")
+        except KeyError as e:
+            logger.debug(f"Problematic document: {doc}")
+
+    return object_types, scalar_representations, data_connector_links, subgraph_name, data_connector_names
+
+def match_object_types(object_types: Dict[str, ObjectTypeRecord], data_connector_links: Dict[str, Any]) -> Dict[str, Any]:
+    # object_types is keyed by normalized name, so matching is a dict lookup
     matched_types = {}
     for dcl_filename, dcl_schema in data_connector_links.items():
         object_types_list = dcl_schema.get('object_types', [])
@@ -177,13 +500,13 @@ def match_object_types(object_types: Dict[str, Any], data_connector_links: Dict[
                 logger.warning(f"Unexpected object type format in {dcl_filename}: {obj_type}")
                 continue
             
-            normalized_name = normalize_name(obj_type_name)
-            matching_object_type = find_matching_object_type(object_types, normalized_name)
+            normalized_name = type_name_forms(obj_type_name).normalized
+            matching_object_type = object_types.get(normalized_name)
             
             if matching_object_type:
                 if normalized_name not in matched_types:
                     matched_types[normalized_name] = {
-                        'object_type': object_types[matching_object_type],
+                        'object_type': matching_object_type,
                         'dcl_type': obj_type,
                         'dcl_filename': dcl_filename
                     }
@@ -192,13 +515,23 @@ def match_object_types(object_types: Dict[str, Any], data_connector_links: Dict[
     
     return matched_types
 
-def generate_scalar_boolean_expression_type(scalar_name: str, scalar_info: Dict[str, Any], dcl_scalar_type: Dict[str, Any], subgraph_name: str) -> Dict[str, Any]:
+def generate_scalar_boolean_expression_type(representations: List[Tuple[ScalarRepresentationRecord, Dict[str, Any]]], subgraph_name: str) -> Dict[str, Any]:
+    # One BooleanExpressionType for a scalar type name, mapped to every connector in representations, a list of
+    # (representation, connector scalar type). Connectors sharing a scalar type name thereby share one BoolExp
+    # instead of producing several with the same name. The first representation sets the type, and only the
+    # comparison operators every connector supports are offered.
+    scalar_info, dcl_scalar_type = representations[0]
+    argument_type = f"{scalar_info.sanitized_representation}!"
+    operator_names = list(dcl_scalar_type.get('comparison_operators', []))
+    for _, other_scalar_type in representations[1:]:
+        other_operators = other_scalar_type.get('comparison_operators', [])
+        operator_names = [op for op in operator_names if op in other_operators]
     comparison_operators = [
-        {'name': op, 'argumentType': f"{sanitize_name(scalar_info['representation'])}!"}
-        for op in dcl_scalar_type.get('comparison_operators', [])
+        {'name': op, 'argumentType': argument_type}
+        for op in operator_names
     ]
     
-    sanitized_scalar_name = sanitize_name(scalar_name)
+    sanitized_scalar_name = scalar_info.sanitized_scalar_type
     
     return {
         'kind': 'BooleanExpressionType',
@@ -207,14 +540,15 @@ def generate_scalar_boolean_expression_type(scalar_name: str, scalar_info: Dict[
             'name': f"{sanitized_scalar_name}BoolExp",
             'operand': {
                 'scalar': {
-                    'type': sanitize_name(scalar_info['representation']),
+                    'type': scalar_info.sanitized_representation,
                     'comparisonOperators': comparison_operators,
                     'dataConnectorOperatorMapping': [
                         {
-                            'dataConnectorName': scalar_info.get('dataConnectorName', 'unknown'),
+                            'dataConnectorName': info.mapping_connector_name,
                             'dataConnectorScalarType': sanitized_scalar_name,
                             'operatorMapping': {}
                         }
+                        for info, _ in representations
                     ]
                 }
             },
@@ -226,19 +560,17 @@ def generate_scalar_boolean_expression_type(scalar_name: str, scalar_info: Dict[
 
 def generate_object_boolean_expression_type(object_name: str, object_info: Dict[str, Any], scalar_bool_exps: Dict[str, Any], object_bool_exps: Dict[str, Any], all_object_types: Dict[str, Any], subgraph_name: str) -> Dict[str, Any]:
     comparable_fields = []
-    capitalized_name = sanitize_name(object_info['object_type'].get('name', capitalize_object_type_name(object_name)))
-
-    for field in object_info['object_type'].get('fields', []):
-        field_name = field['name']
-        field_type = field['type']
-        capitalized_field_type = sanitize_name(capitalize_object_type_name(field_type))
-        lowercased_string = field_type.lower()
-        cleaned_field_type = re.sub(r'[^a-z0-9]', '', lowercased_string)
+    capitalized_name = object_info['object_type'].sanitized_name
 
+    for field in object_info['object_type'].fields:
         # Skip the iteration if field_type is an array type (nested array filtering is not supported)
-        if field_type.startswith('[') and field_type.endswith(']'):
+        if field.is_array:
             continue
 
+        field_name = field.name
+        capitalized_field_type = field.type_forms.sanitized_capitalized
+        cleaned_field_type = field.type_forms.cleaned
+
         # Check if the field type is a scalar type with a boolean expression
         if cleaned_field_type in scalar_bool_exps:
             comparable_fields.append({
@@ -252,7 +584,7 @@ def generate_object_boolean_expression_type(object_name: str, object_info: Dict[
                 'booleanExpressionType': f"{capitalized_field_type}BoolExp"
             })
         # Check if the field type exists in all_object_types
-        elif normalize_name(field_type) in all_object_types:
+        elif field.type_forms.normalized in all_object_types:
             comparable_fields.append({
                 'fieldName': field_name,
                 'booleanExpressionType': f"{capitalized_field_type}BoolExp"
@@ -276,99 +608,353 @@ def generate_object_boolean_expression_type(object_name: str, object_info: Dict[
         }
     }
 
-def generate_boolean_expression_types(matched_object_types: Dict[str, Any], scalar_representations: Dict[str, Any], data_connector_links: Dict[str, Any], subgraph_name: str) -> List[Dict[str, Any]]:
+def build_connector_scalar_type_index(data_connector_links: Dict[str, Any], data_connector_names: Dict[str, str]) -> Dict[Tuple[Optional[str], str], Any]:
+    # Index every connector scalar type by (connector name, scalar type name) once. The (None, name) entry
+    # holds the first connector that defines the scalar, for representations that name no known connector.
+    index = {}
+    for dcl_filename, dcl_schema in data_connector_links.items():
+        connector_name = data_connector_names.get(dcl_filename)
+        scalar_types = dcl_schema.get('scalar_types') or {}
+        if isinstance(scalar_types, dict):
+            entries = scalar_types.items()
+        else:
+            entries = [(st['name'], st) for st in scalar_types if isinstance(st, dict) and 'name' in st]
+        for scalar_type_name, scalar_type_info in entries:
+            index.setdefault((connector_name, scalar_type_name), scalar_type_info)
+            index.setdefault((None, scalar_type_name), scalar_type_info)
+    return index
+
+def generate_boolean_expression_types(matched_object_types: Dict[str, Any], scalar_representations: Dict[Tuple[Optional[str], str], ScalarRepresentationRecord], data_connector_links: Dict[str, Any], subgraph_name: str, data_connector_names: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
     boolean_exp_types = []
     scalar_bool_exps = {}
     object_bool_exps = {}
+    scalar_type_index = build_connector_scalar_type_index(data_connector_links, data_connector_names or {})
+
+    # Resolve each representation against its own connector, and group the representations by the
+    # BooleanExpressionType name they produce, so each scalar gets one BoolExp mapped to all its connectors
+    scalar_groups = {}
+    for key, scalar_info in scalar_representations.items():
+        dcl_scalar_type_name = scalar_info.scalar_type
+        if key not in scalar_type_index:
+            key = (None, dcl_scalar_type_name)
+            if key not in scalar_type_index:
+                continue
+        group = scalar_groups.setdefault(scalar_info.sanitized_scalar_type, [])
+        if group and group[0][0].sanitized_representation != scalar_info.sanitized_representation:
+            logger.warning(f"Scalar type {dcl_scalar_type_name} of connector {scalar_info.mapping_connector_name} is represented as {scalar_info.representation}, "
+                           f"not {group[0][0].representation} like in connector {group[0][0].mapping_connector_name}; it is left out of {scalar_info.sanitized_scalar_type}BoolExp")
+            continue
+        group.append((scalar_info, scalar_type_index[key]))
 
     # Generate BooleanExpressionTypes for scalars
-    for scalar_name, scalar_info in scalar_representations.items():
-        for dcl_filename, dcl_schema in data_connector_links.items():
-            for dcl_scalar_type in dcl_schema.get('scalar_types', []):
-                if isinstance(dcl_scalar_type, dict) and dcl_scalar_type.get('name') == scalar_info['dataConnectorScalarType']:
-                    dcl_scalar_type_info = dcl_schema.get('scalar_types').get(scalar_info['dataConnectorScalarType'])
-                    new_type = generate_scalar_boolean_expression_type(scalar_name, scalar_info, dcl_scalar_type_info, subgraph_name)
-                    boolean_exp_types.append(new_type)
-                    scalar_bool_exps[scalar_name] = new_type
-                    break
-                elif isinstance(dcl_scalar_type, str) and dcl_scalar_type == scalar_info['dataConnectorScalarType']:
-                    dcl_scalar_type_info = dcl_schema.get('scalar_types').get(scalar_info['dataConnectorScalarType'])
-                    new_type = generate_scalar_boolean_expression_type(scalar_name, scalar_info, dcl_scalar_type_info, subgraph_name)
-                    boolean_exp_types.append(new_type)
-                    scalar_bool_exps[scalar_name] = new_type
-                    break
-
-    # First pass: Generate basic BooleanExpressionTypes for objects
-    for object_name, object_info in matched_object_types.items():
-        new_type = generate_object_boolean_expression_type(object_name, object_info, scalar_bool_exps, object_bool_exps, matched_object_types, subgraph_name)
+    for representations in scalar_groups.values():
+        new_type = generate_scalar_boolean_expression_type(representations, subgraph_name)
         boolean_exp_types.append(new_type)
-        object_bool_exps[capitalize_object_type_name(object_name)] = new_type
+        for scalar_info, _ in representations:
+            scalar_bool_exps[scalar_info.scalar_type] = new_type
 
-    # Second pass: Update ObjectType BooleanExpressionTypes with complete comparableFields
+    # Generate each object BooleanExpressionType exactly once, in ObjectType order. Fields refer to other
+    # object BoolExps by name only, so they need not be generated first.
     for object_name, object_info in matched_object_types.items():
-        updated_type = generate_object_boolean_expression_type(object_name, object_info, scalar_bool_exps, object_bool_exps, matched_object_types, subgraph_name)
-        # Replace the old version with the updated one
-        for i, bet in enumerate(boolean_exp_types):
-            if bet['definition']['name'] == updated_type['definition']['name']:
-                boolean_exp_types[i] = updated_type
-                break
+        new_type = generate_object_boolean_expression_type(object_name, object_info, scalar_bool_exps, object_bool_exps, matched_object_types, subgraph_name)
+        object_bool_exps[type_name_forms(object_name).capitalized] = new_type
+        boolean_exp_types.append(new_type)
 
     return boolean_exp_types
 
-def write_new_hml_file(new_boolean_expression_types: List[Dict[str, Any]], output_file: str):
-    with open(output_file, 'w') as file:
-        file.write('---\n')  # Add starting separator
-        for i, bet in enumerate(new_boolean_expression_types):
-            yaml.dump(bet, file)
-            if i < len(new_boolean_expression_types) - 1:  # Don't add extra newline after the last object
-                file.write('\n---\n')  # Add document separator
+def render_boolean_expression_type(bet: Dict[str, Any], rendered: Optional[Dict[str, Tuple[Dict[str, Any], str]]] = None, emitter: str = 'fast') -> str:
+    # rendered maps a BooleanExpressionType name to its last (document, YAML); an equal document is not dumped again.
+    # The fast emitter writes the same bytes as yaml.dump and hands documents it does not support back to it.
+    name = bet['definition']['name']
+    if rendered is not None and name in rendered and rendered[name][0] == bet:
+        return rendered[name][1]
+    text = emit_document(bet) if emitter == 'fast' else None
+    if text is None:
+        output = io.StringIO()
+        yaml.dump(bet, output)
+        text = output.getvalue()
+    if rendered is not None:
+        rendered[name] = (bet, text)
+    return text
+
+def write_new_hml_file(new_boolean_expression_types: List[Dict[str, Any]], output_file: str, rendered: Optional[Dict[str, Tuple[Dict[str, Any], str]]] = None, emitter: str = 'fast') -> bool:
+    output = io.StringIO()
+    output.write('---\n')  # Add starting separator
+    for i, bet in enumerate(new_boolean_expression_types):
+        output.write(render_boolean_expression_type(bet, rendered, emitter))
+        if i < len(new_boolean_expression_types) - 1:  # Don't add extra newline after the last object
+            output.write('\n---\n')  # Add document separator
+    return write_if_changed(output_file, output.getvalue())
+
+def generate_from_parsed_files(parsed_files: Dict[str, List[Dict[str, Any]]]) -> Tuple[MetadataIndex, List[Dict[str, Any]]]:
+    with metrics.stage('extract_types'):
+        metadata_index = MetadataIndex.from_parsed_files(parsed_files)
+        object_types, scalar_representations, data_connector_links, subgraph_name, data_connector_names = extract_types(metadata_index)
+    with metrics.stage('match_object_types'):
+        matched_object_types = match_object_types(object_types, data_connector_links)
+    logger.info(f"Matched {len(matched_object_types)} ObjectTypes with DataConnectorLinks")
+    with metrics.stage('generate_boolean_expression_types'):
+        new_boolean_expression_types = generate_boolean_expression_types(matched_object_types, scalar_representations, data_connector_links, subgraph_name, data_connector_names)
+    logger.info(f"Total ObjectTypes: {len(object_types)}")
+    logger.info(f"Total DataConnectorScalarRepresentations: {len(scalar_representations)}")
+    logger.info(f"Total BooleanExpressionTypes generated: {len(new_boolean_expression_types)}")
+    return metadata_index, new_boolean_expression_types
+
+# Operand type -> BooleanExpressionType index, parse cache and lazy loading used by rewrite workers, set once per worker process
+_rewrite_filter_expression_types: Dict[str, str] = {}
+_rewrite_cache: Optional[ParseCache] = None
+_rewrite_lazy_load = False
+
+def _set_rewrite_filter_expression_types(filter_expression_types: Dict[str, str], cache: Optional[ParseCache] = None, lazy_load: bool = False) -> None:
+    global _rewrite_filter_expression_types, _rewrite_cache, _rewrite_lazy_load
+    _rewrite_filter_expression_types = filter_expression_types
+    _rewrite_cache = cache
+    _rewrite_lazy_load = lazy_load
+
+def _rewrite_hml_item(item: Tuple[str, Optional[str], Optional[List[Dict[str, Any]]]]) -> Tuple[str, bool, int, int, Optional[str]]:
+    # Process and atomically write one file; returns (filename, written, bytes read, bytes written, error).
+    # Without content (--streaming) the file is read and parsed here and released once it is written.
+    filename, content, documents = item
+    bytes_read = 0
+    try:
+        if content is None:
+            with open(filename, 'r') as file:
+                content = file.read()
+                bytes_read = os.fstat(file.fileno()).st_size
+            documents = _rewrite_cache.get(filename, content, parse_variant(False, _rewrite_lazy_load)) if _rewrite_cache else None
+            if documents is None:
+                documents = parse_hml_content(content, filename, lazy=_rewrite_lazy_load)
+        processed_content = process_hml_file(content, _rewrite_filter_expression_types, documents)
+        if write_if_changed(filename, processed_content):
+            return filename, True, bytes_read, len(processed_content.encode('utf-8')), None
+        return filename, False, bytes_read, 0, None
+    except Exception as e:
+        return filename, False, bytes_read, 0, str(e)
+
+def rewrite_hml_files(filenames: List[str], hml_files: Optional[Dict[str, str]], metadata_index: Optional[MetadataIndex], filter_expression_types: Dict[str, str], jobs: int = 1, cache: Optional[ParseCache] = None, lazy_load: bool = False) -> Tuple[int, int]:
+    # Patch Models and drop ObjectBooleanExpressionTypes in the given files, across a worker pool when
+    # jobs > 1; returns (written, unchanged). Per-file errors are reported together at the end.
+    # Without hml_files every file is read and parsed again right before it is rewritten (--streaming).
+    if hml_files is None:
+        items = [(filename, None, None) for filename in filenames]
+    else:
+        items = [(filename, hml_files[filename], metadata_index.documents(filename)) for filename in filenames]
+    if jobs <= 1 or len(items) < 2:
+        _set_rewrite_filter_expression_types(filter_expression_types, cache, lazy_load)
+        results = map(_rewrite_hml_item, items)
+        executor = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=_set_rewrite_filter_expression_types, initargs=(filter_expression_types, cache, lazy_load))
+        results = executor.map(_rewrite_hml_item, items, chunksize=max(1, len(items) // (jobs * 4)))
+
+    files_written = 0
+    files_unchanged = 0
+    errors = []
+    try:
+        for filename, written, bytes_read, bytes_written, error in results:
+            if error is not None:
+                errors.append((filename, error))
+            elif written:
+                files_written += 1
+                logger.info(f"Processed and updated: {filename}")
+            else:
+                files_unchanged += 1
+                logger.debug(f"Processed, unchanged: {filename}")
+            if bytes_read:
+                # Second-pass reads (--streaming) are only reported here, whether they ran in-process or in a worker
+                metrics.count('files_read')
+                metrics.count('bytes_read', bytes_read)
+            if executor and error is None:
+                # Workers count into their own copy of the metrics
+                metrics.count('files_written' if written else 'files_unchanged')
+                metrics.count('bytes_written', bytes_written)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    if errors:
+        logger.error(f"{len(errors)} file(s) could not be processed:")
+        for filename, error in errors:
+            logger.error(f"  {filename}: {error}")
+    return files_written, files_unchanged
+
+def files_to_rewrite(hml_files: Dict[str, str], fast_load: bool) -> List[str]:
+    just_hml_files = [k for k in hml_files if k.endswith('.hml')]
+    if fast_load:
+        # Files without Models or ObjectBooleanExpressionTypes were fast-loaded and have nothing to update
+        just_hml_files = [k for k in just_hml_files if needs_round_trip(k, hml_files[k])]
+    return just_hml_files
+
+def watch_project(project_path: str, output_file: str, interval: float, hml_files: Dict[str, str], parsed_files: Dict[str, List[Dict[str, Any]]],
+                  boolean_expression_types: List[Dict[str, Any]], rendered: Dict[str, Tuple[Dict[str, Any], str]], jobs: int = 1, cache: Optional[ParseCache] = None, fast_load: bool = False, emitter: str = 'fast', walker: Optional[ProjectWalker] = None, lazy_load: bool = False) -> None:
+    # Poll the project and regenerate after every change: only changed files are re-read and re-parsed,
+    # and only the changed files plus those whose Models' filterExpressionType changed are rewritten.
+    # Generating the BooleanExpressionTypes from the parsed documents is cheap and is simply redone;
+    # the output file only re-dumps the types that differ from the previous round (rendered holds the last YAML of each).
+    filter_expression_types = build_filter_expression_index(boolean_expression_types)
+    snapshot = scan_hml_files(project_path, walker)
+    logger.info(f"Watching {project_path} for changes every {interval}s (Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = scan_hml_files(project_path, walker)
+            changed = [path for path, stat in current.items() if snapshot.get(path) != stat]
+            removed = [path for path in snapshot if path not in current]
+            snapshot = current
+            if not changed and not removed:
+                continue
+
+            started = time.perf_counter()
+            for path in removed:
+                hml_files.pop(path, None)
+                parsed_files.pop(path, None)
+                logger.info(f"Removed: {path}")
+            changed_files = {}
+            for path, content, _, error in read_text_files(changed):
+                if error is not None:
+                    logger.warning(f"Error reading file {path}: {error}")
+                else:
+                    changed_files[path] = content
+            try:
+                reparsed = parse_hml_files(changed_files, jobs, cache, fast_load, lazy_load)
+            except ValueError:
+                # Parse file by file so one broken file keeps its previous documents without blocking the others
+                reparsed = {}
+                for path, content in changed_files.items():
+                    try:
+                        reparsed.update(parse_hml_files({path: content}, 1, cache, fast_load, lazy_load))
+                    except ValueError as e:
+                        logger.error(str(e))
+            for path, documents in reparsed.items():
+                hml_files[path] = changed_files[path]
+                parsed_files[path] = documents
+                logger.info(f"Changed: {path}")
+            if not reparsed and not removed:
+                continue
+
+            metadata_index, boolean_expression_types = generate_from_parsed_files(parsed_files)
+            new_filter_expression_types = build_filter_expression_index(boolean_expression_types)
+            affected_operands = {
+                object_type for object_type in set(filter_expression_types) | set(new_filter_expression_types)
+                if filter_expression_types.get(object_type) != new_filter_expression_types.get(object_type)
+            }
+            filter_expression_types = new_filter_expression_types
+
+            # Files that changed, plus files whose Models point at an operand type with a new BooleanExpressionType
+            touched = set(reparsed)
+            touched.update(entry.file for entry in metadata_index.of_kind('Model') if entry.definition.get('objectType') in affected_operands)
+            files_written, files_unchanged = rewrite_hml_files([path for path in files_to_rewrite(hml_files, fast_load) if path in touched], hml_files, metadata_index, filter_expression_types, jobs)
+            if write_new_hml_file(boolean_expression_types, output_file, rendered, emitter):
+                files_written += 1
+                logger.info(f"New BooleanExpressionTypes written to {output_file}")
+            else:
+                files_unchanged += 1
+            for name in set(rendered) - {bet['definition']['name'] for bet in boolean_expression_types}:
+                del rendered[name]
+
+            # Our own writes are not edits to react to
+            snapshot = scan_hml_files(project_path, walker)
+            logger.info(f"Regenerated in {time.perf_counter() - started:.3f}s. Files written: {files_written}, skipped as unchanged: {files_unchanged}")
+    except KeyboardInterrupt:
+        logger.info("Stopped watching")
 
 def main():
     parser = argparse.ArgumentParser(description="Process HML files and generate BooleanExpressionTypes.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     parser.add_argument("--project-path", required=True, help="Path to the project directory containing HML files")
     parser.add_argument("--output-file", required=True, help="Path to the output file for new BooleanExpressionTypes")
+    parser.add_argument("--cache-dir", help="Directory for a persistent parse cache; unchanged files are not re-parsed on later runs")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_CACHE_BYTES // (1024 * 1024), help="Size bound of the parse cache in megabytes (default: %(default)s)")
+    parser.add_argument("--fast-load", action="store_true", help="Read files the tool does not rewrite with a fast safe loader and leave them untouched")
+    parser.add_argument("--lazy-load", action="store_true", help="Only parse documents of the kinds the tool reads or changes; the others are found by their kind: line and written back unchanged")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes used to parse and rewrite HML files (0 uses all CPUs, default: 1)")
+    parser.add_argument("--watch", action="store_true", help="Keep running and regenerate incrementally whenever HML files in the project change")
+    parser.add_argument("--watch-interval", type=float, default=0.5, help="Seconds between polls of the project in --watch mode (default: %(default)s)")
+    parser.add_argument("--streaming", action="store_true", help="Hold one file at a time instead of the whole project, reading each file twice; peak memory follows the largest file")
+    parser.add_argument("--emitter", choices=("fast", "ruamel"), default="fast", help="Serializer for the generated BooleanExpressionTypes; both write identical YAML (default: %(default)s)")
+    parser.add_argument("--include", action="append", help=f"File patterns to read, comma-separated and repeatable; a pattern with a slash matches the path relative to the project (default: {','.join(DEFAULT_INCLUDE)})")
+    parser.add_argument("--exclude", action="append", help=f"File and directory patterns to skip, comma-separated and repeatable; excluded directories are not descended into (default: {','.join(DEFAULT_EXCLUDE)})")
+    parser.add_argument("--no-gitignore", action="store_true", help="Also read files and directories ignored by the project's .gitignore files")
+    parser.add_argument("--metrics", help="Write per-stage timings, I/O and document counts and peak memory of the run as JSON to this file")
+    parser.add_argument("--metrics-allocations", action="store_true", help="With --metrics, also trace the peak of Python allocations; this slows the run down several times, so stage timings are not representative")
     args = parser.parse_args()
 
+    if args.metrics_allocations and not args.metrics:
+        parser.error("--metrics-allocations requires --metrics")
+    if args.metrics:
+        metrics.start(trace_allocations=args.metrics_allocations)
+
     logger.info(f"Starting HML processing for project path: {args.project_path}")
 
-    try:
-        hml_files = read_all_hml_files(args.project_path)
-        logger.info(f"Found {len(hml_files)} HML files (excluding node_modules)")
+    if args.streaming and args.watch:
+        parser.error("--streaming cannot be combined with --watch, which keeps the whole project in memory")
 
-        parsed_files = {}
-        for filename, content in hml_files.items():
+    try:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        cache = ParseCache(args.cache_dir, 'boolean-expression-types', args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+        walker = project_walker(split_patterns(args.include), split_patterns(args.exclude) if args.exclude else None, not args.no_gitignore)
+
+        if args.streaming:
+            # Hold one file at a time: the first pass keeps only what generation needs, the second rewrites
+            with metrics.stage('discovery'):
+                filenames = list(scan_hml_files(args.project_path, walker))
+            logger.info(f"Found {len(filenames)} HML files")
+            with metrics.stage('parse'):
+                scanned = scan_hml_files_streaming(filenames, jobs, cache, args.fast_load, args.lazy_load)
+            if scanned is None:
+                return
+            parsed_files, rewrite_filenames = scanned
+            hml_files = None
+            document_count = sum(metrics.documents_by_kind.values())
+        else:
+            with metrics.stage('discovery'):
+                hml_files = read_all_hml_files(args.project_path, walker)
+            logger.info(f"Found {len(hml_files)} HML files")
             try:
-                parsed_files[filename] = parse_hml_content(content, filename)
+                with metrics.stage('parse'):
+                    parsed_files = parse_hml_files(hml_files, jobs, cache, args.fast_load, args.lazy_load)
             except ValueError as e:
                 logger.error(str(e))
                 return
+            metrics.count_documents(document for documents in parsed_files.values() for document in documents)
+            rewrite_filenames = files_to_rewrite(hml_files, args.fast_load)
+            document_count = sum(len(docs) for docs in parsed_files.values())
+        if cache:
+            logger.info(f"Parse cache: {cache.hits} hits, {cache.misses} misses")
+
+        logger.info(f"Parsed {document_count} documents from HML files")
+        logger.info(f"Total HML files processed: {len(parsed_files)}")
+        metadata_index, new_boolean_expression_types = generate_from_parsed_files(parsed_files)
+
+        # Process each HML file, sharing one operand type -> BooleanExpressionType index across all of them
+        filter_expression_types = build_filter_expression_index(new_boolean_expression_types)
+        with metrics.stage('process_hml_files'):
+            files_written, files_unchanged = rewrite_hml_files(rewrite_filenames, hml_files, metadata_index, filter_expression_types, jobs, cache, args.lazy_load)
+
+        rendered = {}
+        with metrics.stage('write_output'):
+            output_written = write_new_hml_file(new_boolean_expression_types, args.output_file, rendered, args.emitter)
+        if output_written:
+            files_written += 1
+            logger.info(f"New BooleanExpressionTypes written to {args.output_file}")
+        else:
+            files_unchanged += 1
+            logger.info(f"BooleanExpressionTypes in {args.output_file} are unchanged")
 
-        logger.info(f"Parsed {sum(len(docs) for docs in parsed_files.values())} documents from HML files")
-        
-        object_types, scalar_representations, data_connector_links, subgraph_name = extract_types(parsed_files)
-        matched_object_types = match_object_types(object_types, data_connector_links)
-        logger.info(f"Matched {len(matched_object_types)} ObjectTypes with DataConnectorLinks")
-        
-        new_boolean_expression_types = generate_boolean_expression_types(matched_object_types, scalar_representations, data_connector_links, subgraph_name)
-        
-        logger.info(f"Total HML files processed: {len(hml_files)}")
-        logger.info(f"Total ObjectTypes: {len(object_types)}")
-        logger.info(f"Total DataConnectorScalarRepresentations: {len(scalar_representations)}")
-        logger.info(f"Total BooleanExpressionTypes generated: {len(new_boolean_expression_types)}")
-
-        # Process each HML file
-        just_hml_files = {k: v for k, v in hml_files.items() if k.endswith('.hml')}
-        for filename, content in just_hml_files.items():
-            try:
-                processed_content = process_hml_file(content, new_boolean_expression_types)
-                with open(filename, 'w') as file:
-                    file.write(processed_content)
-                logger.info(f"Processed and updated: {filename}")
-            except Exception as e:
-                logger.error(f"Error processing file {filename}: {str(e)}")
+        logger.info(f"Files written: {files_written}, skipped as unchanged: {files_unchanged}")
+
+        if cache:
+            with metrics.stage('cache_prune'):
+                cache.prune()
+
+        if args.metrics:
+            metrics.write(args.metrics)
+            logger.info(f"Metrics written to {args.metrics}")
 
-        write_new_hml_file(new_boolean_expression_types, args.output_file)
-        logger.info(f"New BooleanExpressionTypes written to {args.output_file}")
+        if args.watch:
+            watch_project(args.project_path, args.output_file, args.watch_interval, hml_files, parsed_files, new_boolean_expression_types, rendered, jobs, cache, args.fast_load, args.emitter, walker, args.lazy_load)
 
     except Exception as e:
         log_error_with_line_number(f"An error occurred: {str(e)}")
@@ -376,4 +962,8 @@ def main():
         logger.debug(f"Stack trace: {traceback.format_exc()}")
 
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        # Lets --jobs worker processes start from a PyInstaller executable
+        import multiprocessing
+        multiprocessing.freeze_support()
     main()
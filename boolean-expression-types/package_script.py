@@ -2,6 +2,13 @@ import PyInstaller.__main__
 import os
 import sys
 
+# Usage: python package_script.py [--onedir]
+#
+# --onefile (the default) builds dist/boolean-generator, a single file that unpacks its bundled Python and
+# libraries to a temporary directory on every launch. --onedir builds dist/onedir/boolean-generator/ with the
+# executable next to its unpacked libraries, which skips that step and starts much faster; ship the whole directory.
+onedir = '--onedir' in sys.argv[1:]
+
 # Get the path to the virtual environment created by Poetry
 venv_path = os.popen('poetry env info --path').read().strip()
 
@@ -16,12 +23,27 @@ if not os.path.exists(main_script):
 
 print(f"Using {main_script} as the main script.")
 
+# The shared helpers are a path dependency; pointing PyInstaller at them as well lets the build find them
+# even when it runs outside the Poetry environment
+common_dir = os.path.abspath(os.path.join('..', 'hml-common'))
+
+if onedir:
+    # The spec goes to build/onedir so the checked-in boolean-generator.spec (--onefile) is left alone,
+    # and paths in it are resolved relative to that directory
+    layout_args = ['--onedir', '--distpath=dist/onedir', '--specpath=build/onedir']
+    main_script = os.path.abspath(main_script)
+    package_dir = os.path.abspath('boolean_expression_types')
+else:
+    layout_args = ['--onefile']
+    package_dir = 'boolean_expression_types'
+
 PyInstaller.__main__.run([
     main_script,
-    '--onefile',
+    *layout_args,
     '--name=boolean-generator',
     f'--paths={venv_path}/lib/python3.12/site-packages',
-    '--add-data=boolean_expression_types:boolean_expression_types',
+    f'--paths={common_dir}',
+    f'--add-data={package_dir}:boolean_expression_types',
     '--hidden-import=ruamel.yaml',
     '--hidden-import=ruamel.yaml.constructor',
     '--hidden-import=ruamel.yaml.representer',
@@ -0,0 +1,131 @@
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+from ruamel.yaml import YAML
+from ruamel.yaml.events import AliasEvent, MappingEndEvent, MappingStartEvent, ScalarEvent, SequenceEndEvent, SequenceStartEvent
+from ruamel.yaml.nodes import ScalarNode
+from ruamel.yaml.resolver import VersionedResolver
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString, LiteralScalarString
+
+from hml_common.fast_loader import create_fast_yaml
+
+# Sections of definition.schema.schema that the generators read
+SCHEMA_SECTIONS = ('scalar_types', 'object_types')
+
+DATA_CONNECTOR_LINK_PATTERN = re.compile(r'^kind:\s*["\']?DataConnectorLink["\']?\s*(?:#.*)?$', re.MULTILINE)
+
+_event_yaml = YAML(typ='safe')  # Event stream from the C parser when ruamel.yaml.clib is installed
+_resolver = VersionedResolver()
+_scalar_yaml = create_fast_yaml()
+
+def is_data_connector_link(document: str) -> bool:
+    return DATA_CONNECTOR_LINK_PATTERN.search(document) is not None
+
+@lru_cache(maxsize=1024)
+def _plain_scalar(value: str) -> Any:
+    # Non-string plain scalars (null, booleans, numbers) are rare and repetitive; let the loader resolve them
+    return _scalar_yaml.load(value)
+
+def _scalar(event: ScalarEvent) -> Any:
+    # Build strings the same way the fast loader does, keeping their quoting style
+    if event.tag not in (None, '!'):
+        raise ValueError(f"Explicitly tagged scalar {event.tag} is not supported")
+    style = event.style
+    if style == '"':
+        return DoubleQuotedScalarString(event.value)
+    if style == "'":
+        return SingleQuotedScalarString(event.value)
+    if style == '|':
+        return LiteralScalarString(event.value)
+    if style == '>':
+        return event.value
+    if _resolver.resolve(ScalarNode, event.value, event.implicit) == 'tag:yaml.org,2002:str':
+        return sys.intern(event.value)  # Keys such as 'type' and 'name' repeat throughout a schema
+    return _plain_scalar(event.value)
+
+def _build(event: Any, events: Iterator[Any], anchors: Dict[str, Any]) -> Any:
+    # Construct the node that starts with event as plain dicts, lists and scalars
+    if isinstance(event, AliasEvent):
+        return anchors[event.anchor]
+    if isinstance(event, ScalarEvent):
+        value = _scalar(event)
+    elif isinstance(event, MappingStartEvent):
+        value = {}
+        for key_event in events:
+            if isinstance(key_event, MappingEndEvent):
+                break
+            key = _build(key_event, events, anchors)
+            value[key] = _build(next(events), events, anchors)
+    elif isinstance(event, SequenceStartEvent):
+        value = []
+        for item_event in events:
+            if isinstance(item_event, SequenceEndEvent):
+                break
+            value.append(_build(item_event, events, anchors))
+    else:
+        raise ValueError(f"Unexpected YAML event {event}")
+    if getattr(event, 'anchor', None):
+        anchors[event.anchor] = value
+    return value
+
+def _skip(event: Any, events: Iterator[Any]) -> None:
+    # Consume the node that starts with event without constructing anything
+    if not isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+        return
+    depth = 1
+    for event in events:
+        if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+            depth -= 1
+            if depth == 0:
+                return
+
+def _mapping_items(events: Iterator[Any], anchors: Dict[str, Any]) -> Iterator[Any]:
+    # Yield (key, first event of the value); the caller must build or skip the value before the next item
+    for event in events:
+        if isinstance(event, MappingEndEvent):
+            return
+        yield _build(event, events, anchors), next(events)
+
+def _extract_mapping(events: Iterator[Any], anchors: Dict[str, Any], wanted: Dict[str, Any]) -> Dict[str, Any]:
+    # wanted maps a key to True (build the value) or to a nested wanted mapping (descend into it)
+    result = {}
+    for key, event in _mapping_items(events, anchors):
+        selector = wanted.get(key)
+        if selector is True:
+            result[key] = _build(event, events, anchors)
+        elif selector and isinstance(event, MappingStartEvent):
+            result[key] = _extract_mapping(events, anchors, selector)
+        else:
+            _skip(event, events)
+    return result
+
+DATA_CONNECTOR_LINK_SELECTOR = {
+    'kind': True,
+    'version': True,
+    'definition': {
+        'name': True,
+        'schema': {
+            'schema': {section: True for section in SCHEMA_SECTIONS},
+        },
+    },
+}
+
+def extract_data_connector_link(document: str) -> Optional[Dict[str, Any]]:
+    """
+    Pull only the kind, connector name and definition.schema.schema scalar_types/object_types out of a
+    single DataConnectorLink document, walking the parser's event stream. Everything else (capabilities,
+    collections, functions, procedures, ...) is skipped without being constructed, and the result is made
+    of plain dicts. Returns None when the document is not a DataConnectorLink.
+    """
+    events = iter(_event_yaml.parse(document))
+    anchors = {}
+    for event in events:
+        if isinstance(event, MappingStartEvent):
+            link = _extract_mapping(events, anchors, DATA_CONNECTOR_LINK_SELECTOR)
+            return link if link.get('kind') == 'DataConnectorLink' else None
+        if isinstance(event, (ScalarEvent, SequenceStartEvent, AliasEvent)):
+            return None
+    return None
@@ -0,0 +1,81 @@
+import os
+import re
+import mmap
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, NamedTuple, Union
+
+# `---` up to the end of its line. Only matches at column 0 are separators, as in the YAML spec, so an
+# indented `---`, e.g. a line of a block scalar, never splits a document.
+# Searching for the literal first is much faster than anchoring the pattern at every line start.
+SEPARATOR_PATTERN = re.compile(r'---[ \t\r\f\v]*(?:\n|\Z)')
+SEPARATOR_BYTES_PATTERN = re.compile(rb'---[ \t\r\f\v]*(?:\n|\Z)')
+
+Buffer = Union[str, bytes, mmap.mmap]
+
+class DocumentSpan(NamedTuple):
+    start: int
+    end: int
+    separator_end: int  # End of the separator line after the document; equal to end when none follows
+
+def document_spans(buffer: Buffer) -> Iterator[DocumentSpan]:
+    """
+    Find the documents of an HML file in one pass over a string, bytes or memory-mapped file, without copying.
+
+    Separators before the first document and repeated separators are dropped, like they are when a file
+    is rewritten, so every span holds at least one line.
+    """
+    text = isinstance(buffer, str)
+    pattern, newline = (SEPARATOR_PATTERN, '\n') if text else (SEPARATOR_BYTES_PATTERN, b'\n')
+    position = 0
+    for match in pattern.finditer(buffer):
+        start = match.start()
+        if start > 0 and buffer[start - 1:start] != newline:
+            continue
+        if start > position:
+            yield DocumentSpan(position, start, match.end())
+        position = match.end()
+    if position < len(buffer):
+        yield DocumentSpan(position, len(buffer), len(buffer))
+
+def document_separators(content: str) -> List[str]:
+    """
+    The original separator lines of content, for writing the documents back, without copying the documents.
+    """
+    return [content[span.end:span.separator_end] for span in document_spans(content) if span.separator_end > span.end]
+
+@contextmanager
+def mapped_file(file_path: str) -> Iterator[Buffer]:
+    """
+    Map a file read-only into memory; an empty file, which cannot be mapped, gives empty bytes.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def iter_documents(buffer: Buffer, encoding: str = 'utf-8') -> Iterator[str]:
+    """
+    Decode the documents of a mapped file one at a time, so memory use is bounded by the largest document.
+    Line endings are translated like a file read in text mode, so the documents equal those of the same file read as text.
+    """
+    if isinstance(buffer, str):
+        for span in document_spans(buffer):
+            yield buffer[span.start:span.end]
+        return
+    for span in document_spans(buffer):
+        yield buffer[span.start:span.end].decode(encoding).replace('\r\n', '\n')
+
+def mapping_loader(load: Callable[[str], Any]) -> Callable[[str], Any]:
+    """
+    Wrap a document loader to reject top-level values other than mappings. HML documents are mappings, so
+    anything else is a fragment left by a document marker the splitter does not treat as a separator, such
+    as `--- !tag` or `...`, and the caller should load the whole file with load_all instead.
+    """
+    def load_mapping(document: str) -> Any:
+        loaded = load(document)
+        if loaded is not None and not isinstance(loaded, dict):
+            raise ValueError(f"document is a {type(loaded).__name__}, not a mapping")
+        return loaded
+    return load_mapping
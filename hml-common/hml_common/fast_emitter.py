@@ -0,0 +1,97 @@
+import re
+from typing import Any, List, Optional
+
+# Writes generated documents, which are plain dicts, lists and scalars, in exactly the block layout the
+# round-trip dumper produces (mapping indent 2, sequence indent 4 with offset 2, explicit null), without
+# going through ruamel's representer, serializer and emitter. Anything outside that shape makes
+# emit_document() return None so the caller can fall back to yaml.dump for that document.
+
+# Strings ruamel writes unquoted: identifiers, optionally with a trailing `!` (e.g. `Int4!`) and words
+# separated by single spaces. The reserved words below would resolve to booleans or null.
+PLAIN_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?: [A-Za-z0-9_]+)*!?\Z')
+RESERVED_WORDS = frozenset(['y', 'yes', 'n', 'no', 'true', 'false', 'on', 'off', 'null'])
+# Content that quoted scalars keep verbatim between their quotes
+QUOTABLE_PATTERN = re.compile(r'[A-Za-z0-9_ .!-]*\Z')
+# Longer scalars may get folded at the dumper's line width
+MAX_SCALAR_LENGTH = 1024
+
+class UnsupportedDocument(Exception):
+    pass
+
+def _quoted_style(value: str) -> Optional[str]:
+    # Quote character of a ruamel quoted string (kept from the source with preserve_quotes), '' for a plain str
+    if type(value) is str:
+        return ''
+    from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString
+    if type(value) is DoubleQuotedScalarString:
+        style = '"'
+    elif type(value) is SingleQuotedScalarString:
+        style = "'"
+    else:
+        return None
+    return style if value.yaml_anchor() is None else None
+
+def format_scalar(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if type(value) is int:
+        return str(value)
+    if isinstance(value, str) and len(value) <= MAX_SCALAR_LENGTH:
+        style = _quoted_style(value)
+        if style == '':
+            if PLAIN_PATTERN.match(value) and value.lower() not in RESERVED_WORDS:
+                return value
+        elif style and QUOTABLE_PATTERN.match(value):
+            return f"{style}{value}{style}"
+    raise UnsupportedDocument(value)
+
+def _emit_mapping(mapping: dict, indent: int, lines: List[str], first_prefix: Optional[str] = None) -> None:
+    # first_prefix replaces the indentation of the first key, for a mapping that starts on a `- ` line
+    prefix = ' ' * indent
+    for key, value in mapping.items():
+        if not isinstance(key, str):
+            raise UnsupportedDocument(key)
+        line = f"{first_prefix if first_prefix is not None else prefix}{format_scalar(key)}:"
+        first_prefix = None
+        if type(value) is dict and value:
+            lines.append(line)
+            _emit_mapping(value, indent + 2, lines)
+        elif type(value) is list and value:
+            lines.append(line)
+            _emit_sequence(value, indent + 2, lines)
+        elif type(value) is dict:
+            lines.append(f"{line} {{}}")
+        elif type(value) is list:
+            lines.append(f"{line} []")
+        else:
+            lines.append(f"{line} {format_scalar(value)}")
+
+def _emit_sequence(sequence: list, indent: int, lines: List[str]) -> None:
+    # Items start with `- ` at indent, their content continues at indent + 2
+    dash = ' ' * indent + '- '
+    for item in sequence:
+        if type(item) is dict and item:
+            _emit_mapping(item, indent + 2, lines, dash)
+        elif type(item) is dict or type(item) is list:
+            raise UnsupportedDocument(item)
+        else:
+            lines.append(f"{dash}{format_scalar(item)}")
+
+def emit_document(document: Any) -> Optional[str]:
+    """
+    Render a generated document like yaml.dump does, or return None when it holds anything but plain
+    dicts, lists and simple scalars (nested sequences, comments, anchors, floats, strings that need quoting).
+    """
+    if type(document) is not dict or not document:
+        return None
+    lines = []
+    try:
+        _emit_mapping(document, 0, lines)
+    except UnsupportedDocument:
+        return None
+    lines.append('')
+    return '\n'.join(lines)
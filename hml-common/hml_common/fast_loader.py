@@ -0,0 +1,33 @@
+from typing import Any
+from ruamel.yaml import YAML
+from ruamel.yaml.constructor import SafeConstructor
+from ruamel.yaml.scalarstring import DoubleQuotedScalarString, SingleQuotedScalarString, LiteralScalarString
+
+class QuotedStringSafeConstructor(SafeConstructor):
+    """
+    Safe constructor that keeps the quoting style of string scalars.
+
+    Names read from inputs (connector names, operator and function names, ...) are copied into the
+    generated documents, so they must dump exactly as they would after a round-trip load.
+    """
+
+    def construct_yaml_str(self, node: Any) -> Any:
+        value = self.construct_scalar(node)
+        if node.style == '"':
+            return DoubleQuotedScalarString(value)
+        if node.style == "'":
+            return SingleQuotedScalarString(value)
+        if node.style == '|':
+            return LiteralScalarString(value)
+        return value
+
+QuotedStringSafeConstructor.add_constructor('tag:yaml.org,2002:str', QuotedStringSafeConstructor.construct_yaml_str)
+
+def create_fast_yaml() -> YAML:
+    """
+    Create a loader for documents that are only read, never rewritten. It builds plain dicts and lists
+    without comment or formatting bookkeeping and uses the C parser when ruamel.yaml.clib is installed.
+    """
+    fast_yaml = YAML(typ='safe')
+    fast_yaml.Constructor = QuotedStringSafeConstructor
+    return fast_yaml
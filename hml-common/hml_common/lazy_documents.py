@@ -0,0 +1,31 @@
+import re
+from typing import Any, Callable, Collection, Iterable, List, NamedTuple, Optional
+
+# Top-level `kind:` line holding a plain or quoted identifier. Documents that state their kind any other way
+# (flow style, tags, anchors) are simply parsed to find out.
+KIND_PATTERN = re.compile(r'^kind:[ \t]*(["\']?)([A-Za-z_][A-Za-z0-9_]*)\1[ \t\r]*(?:#.*)?$', re.MULTILINE)
+
+class RawDocument(NamedTuple):
+    """
+    A document kept as its source text because its kind is not one the tool reads. Rewriting a file
+    writes the text back verbatim instead of dumping a parsed copy.
+    """
+    kind: str
+    text: str
+
+def sniff_kind(document: str) -> Optional[str]:
+    """
+    The top-level kind of a document read from its `kind:` line, without parsing it, or None if there is none.
+    """
+    match = KIND_PATTERN.search(document)
+    return match.group(2) if match else None
+
+def load_documents(documents: Iterable[str], load: Callable[[str], Any], kinds: Collection[str]) -> List[Any]:
+    """
+    Load the documents of one of kinds, or whose kind cannot be sniffed, and keep the rest as RawDocuments.
+    """
+    loaded = []
+    for document in documents:
+        kind = sniff_kind(document)
+        loaded.append(load(document) if kind is None or kind in kinds else RawDocument(kind, document))
+    return loaded
@@ -0,0 +1,17 @@
+from typing import Any, Callable
+
+class LazyYAML:
+    """
+    Stand-in for a ruamel.yaml YAML instance that is only created, and ruamel.yaml only imported, on
+    first use. Attribute access is forwarded to the real instance, so callers use it like the instance.
+    This keeps `--help`, `--version` and argument errors from paying for the import at startup.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        if self._instance is None:
+            self._instance = self._factory()
+        return getattr(self._instance, name)
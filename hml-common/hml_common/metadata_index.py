@@ -0,0 +1,116 @@
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+def normalize_name(name: str) -> str:
+    # Remove any non-alphanumeric characters and convert to lowercase
+    normalized = re.sub(r'[^a-zA-Z0-9]', '', name).lower()
+    return normalized
+
+class IndexedDocument(NamedTuple):
+    file: str
+    position: int  # Index of the document within its file
+    document: Dict[str, Any]
+
+    @property
+    def kind(self) -> Optional[str]:
+        return self.document.get('kind')
+
+    @property
+    def definition(self) -> Dict[str, Any]:
+        return self.document.get('definition') or {}
+
+def document_name(document: Dict[str, Any]) -> Optional[str]:
+    """
+    The name a document is looked up by: definition.name, or the data connector scalar type of a
+    DataConnectorScalarRepresentation.
+    """
+    definition = document.get('definition')
+    if not isinstance(definition, dict):
+        return None
+    if document.get('kind') == 'DataConnectorScalarRepresentation':
+        return definition.get('dataConnectorScalarType')
+    return definition.get('name')
+
+def document_connectors(document: Dict[str, Any]) -> List[str]:
+    """
+    Names of the data connectors a document belongs to.
+    """
+    definition = document.get('definition')
+    if not isinstance(definition, dict):
+        return []
+    kind = document.get('kind')
+    if kind == 'DataConnectorLink':
+        connectors = [definition.get('name')]
+    elif kind == 'Model':
+        connectors = [(definition.get('source') or {}).get('dataConnectorName')]
+    elif kind == 'ObjectType':
+        connectors = [mapping.get('dataConnectorName') for mapping in definition.get('dataConnectorTypeMapping') or [] if isinstance(mapping, dict)]
+    else:
+        connectors = [definition.get('dataConnectorName')]
+    return list(dict.fromkeys(connector for connector in connectors if connector))
+
+class MetadataIndex:
+    """
+    In-memory index of the documents of a project, built in one pass over the parsed files.
+
+    Documents are grouped by kind and can be looked up in constant time by kind and name, and by kind
+    and data connector. Every entry records the file and position it came from. When several documents
+    share a name, lookups return the one indexed last, as a later definition replaces an earlier one.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, List[Any]] = {}
+        self._by_kind: Dict[Optional[str], List[IndexedDocument]] = {}
+        self._by_name: Dict[Tuple[str, str], List[IndexedDocument]] = {}
+        self._by_connector: Dict[Tuple[str, str], List[IndexedDocument]] = {}
+        self._by_connector_name: Dict[Tuple[str, str, str], IndexedDocument] = {}
+
+    @classmethod
+    def from_parsed_files(cls, parsed_files: Dict[str, List[Any]]) -> 'MetadataIndex':
+        index = cls()
+        for file_path, documents in parsed_files.items():
+            index.add_file(file_path, documents)
+        return index
+
+    def add_file(self, file_path: str, documents: Iterable[Any]) -> None:
+        """
+        Index the parsed documents of a file. Empty (None) documents keep their position but are not indexed.
+        """
+        if file_path in self._files:
+            raise ValueError(f"{file_path} is already indexed")
+        documents = list(documents)
+        self._files[file_path] = documents
+        for position, document in enumerate(documents):
+            if not isinstance(document, dict):
+                continue
+            entry = IndexedDocument(file_path, position, document)
+            kind = entry.kind
+            self._by_kind.setdefault(kind, []).append(entry)
+            name = document_name(document)
+            if isinstance(name, str):
+                self._by_name.setdefault((kind, name), []).append(entry)
+            for connector in document_connectors(document):
+                self._by_connector.setdefault((kind, connector), []).append(entry)
+                if isinstance(name, str):
+                    self._by_connector_name[(kind, connector, name)] = entry
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._files
+
+    def documents(self, file_path: str) -> List[Any]:
+        return self._files.get(file_path, [])
+
+    def of_kind(self, kind: str) -> List[IndexedDocument]:
+        return self._by_kind.get(kind, [])
+
+    def get(self, kind: str, name: str, connector: Optional[str] = None) -> Optional[IndexedDocument]:
+        """
+        The document of a kind with the given name, optionally only among those of one data connector.
+        """
+        if connector is not None:
+            return self._by_connector_name.get((kind, connector, name))
+        entries = self._by_name.get((kind, name))
+        return entries[-1] if entries else None
+
+    def of_connector(self, kind: str, connector: str) -> List[IndexedDocument]:
+        return self._by_connector.get((kind, connector), [])
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+def _children_cpu_seconds() -> float:
+    # CPU time of finished worker processes (--jobs), which process_time() does not include
+    times = os.times()
+    return times.children_user + times.children_system
+
+def _max_rss_bytes(who: int) -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(who).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024  # Bytes on macOS, kilobytes elsewhere
+
+class RunMetrics:
+    """
+    Wall and CPU time per stage, I/O and document counters of one run, written as JSON for --metrics.
+
+    Counters are always kept since they are cheap. Stage timing only happens after start(). Allocation
+    tracing is opt-in on top of that: tracemalloc slows a run down several times over, which would make
+    the stage timings of the same report meaningless, so peak RSS is the default memory measure.
+    """
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.enabled = False
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {'files_read': 0, 'bytes_read': 0, 'files_written': 0, 'files_unchanged': 0, 'bytes_written': 0}
+        self.documents_by_kind: Dict[str, int] = {}
+        self._started = None
+
+    def start(self, trace_allocations: bool = False) -> None:
+        self.enabled = True
+        self._started = (time.perf_counter(), time.process_time(), _children_cpu_seconds())
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        wall, cpu, children_cpu = time.perf_counter(), time.process_time(), _children_cpu_seconds()
+        try:
+            yield
+        finally:
+            stage = self.stages.setdefault(name, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            stage['wall_seconds'] += time.perf_counter() - wall
+            stage['cpu_seconds'] += time.process_time() - cpu + _children_cpu_seconds() - children_cpu
+            stage['calls'] += 1
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def count_documents(self, documents: Iterable[Any]) -> None:
+        for document in documents:
+            if isinstance(document, dict):
+                kind = str(document.get('kind'))
+                self.documents_by_kind[kind] = self.documents_by_kind.get(kind, 0) + 1
+
+    def merge(self, counters: Dict[str, int], documents_by_kind: Dict[str, int]) -> None:
+        # Add counts gathered in a worker process
+        for counter, amount in counters.items():
+            self.count(counter, amount)
+        for kind, amount in documents_by_kind.items():
+            self.documents_by_kind[kind] = self.documents_by_kind.get(kind, 0) + amount
+
+    def report(self) -> Dict[str, Any]:
+        report = {'tool': self.tool}
+        if self._started:
+            wall, cpu, children_cpu = self._started
+            report['wall_seconds'] = time.perf_counter() - wall
+            report['cpu_seconds'] = time.process_time() - cpu + _children_cpu_seconds() - children_cpu
+        report['stages'] = self.stages
+        report.update(self.counters)
+        report['documents_parsed'] = sum(self.documents_by_kind.values())
+        report['documents_by_kind'] = dict(sorted(self.documents_by_kind.items()))
+        report['peak_rss_bytes'] = _max_rss_bytes(resource.RUSAGE_SELF) if resource else None
+        report['peak_rss_children_bytes'] = _max_rss_bytes(resource.RUSAGE_CHILDREN) if resource else None
+        report['allocation_peak_bytes'] = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        return report
+
+    def write(self, file_path: str) -> None:
+        with open(file_path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+            f.write('\n')
@@ -0,0 +1,161 @@
+import os
+import mmap
+import pickle
+import hashlib
+import logging
+from typing import Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shape of the cached documents changes
+CACHE_FORMAT_VERSION = 4
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# File content as text, or as the raw bytes of the file (e.g. memory-mapped)
+Content = Union[str, bytes, mmap.mmap]
+
+def content_digest(content: Content) -> Tuple[int, str]:
+    # Returns (size in bytes, content hash)
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    return len(data), hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class ParseCache:
+    """
+    On-disk cache of parsed HML documents, one entry file per source file.
+
+    Each entry is a small pickled header (source path, size, mtime and content hash) followed by the
+    pickled documents, so validity can be checked without loading the documents. A lookup is a hit when
+    the file's size and mtime are unchanged, or otherwise when the content hash still matches, so an
+    unchanged file never goes through ruamel again while an edited one is always re-parsed. prune() evicts entries whose source file was deleted or changed size
+    and then the least recently used entries until the cache fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, namespace: str, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, path: str, variant: str) -> str:
+        key = hashlib.sha1(f"{self.namespace}\0{variant}\0{os.path.abspath(path)}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def _read_header(self, f) -> Optional[dict]:
+        try:
+            header = pickle.load(f)
+        except Exception as e:
+            logger.debug(f"Discarding unreadable cache entry {f.name}: {str(e)}")
+            return None
+        if not isinstance(header, dict) or header.get('version') != CACHE_FORMAT_VERSION:
+            return None
+        return header
+
+    def _is_current(self, header: dict, path: str, content: Content) -> bool:
+        try:
+            st = os.stat(path)
+            if st.st_size == header['size'] and st.st_mtime_ns == header['mtime_ns']:
+                return True
+        except OSError:
+            pass
+        return (header['size'], header['hash']) == content_digest(content)
+
+    def get(self, path: str, content: Content, variant: str = '') -> Optional[List[Any]]:
+        """
+        Return the cached documents for path if they were parsed from exactly this content.
+        variant separates documents of the same file produced by different loaders.
+        """
+        entry_path = self._entry_path(path, variant)
+        documents = None
+        try:
+            with open(entry_path, 'rb') as f:
+                header = self._read_header(f)
+                if header is not None and self._is_current(header, path, content):
+                    documents = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Discarding unreadable cache entry {entry_path}: {str(e)}")
+            documents = None
+
+        if documents is None:
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry_path)  # Mark as recently used for eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return documents
+
+    def put(self, path: str, content: Content, documents: List[Any], variant: str = '') -> None:
+        """
+        Store the documents parsed from content, replacing any stale entry for path.
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        size, digest = content_digest(content)
+        header = {
+            'version': CACHE_FORMAT_VERSION,
+            'path': os.path.abspath(path),
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'hash': digest,
+        }
+        entry_path = self._entry_path(path, variant)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except Exception as e:
+            logger.warning(f"Could not write parse cache entry for {path}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def prune(self) -> int:
+        """
+        Evict stale entries and then least recently used ones until the cache fits in max_bytes.
+        Returns the number of evicted entries.
+        """
+        evicted = 0
+        live = []
+        for name in os.listdir(self.cache_dir):
+            entry_path = os.path.join(self.cache_dir, name)
+            if not name.endswith('.pickle'):
+                continue
+            try:
+                with open(entry_path, 'rb') as f:
+                    header = self._read_header(f)
+            except OSError:
+                continue
+            stale = header is None
+            if header is not None:
+                # The source was deleted or visibly changed since it was cached. A same-size edit is
+                # caught by the content hash on the next lookup and overwritten by put().
+                try:
+                    stale = os.stat(header['path']).st_size != header['size']
+                except OSError:
+                    stale = True
+            if stale:
+                os.remove(entry_path)
+                evicted += 1
+            else:
+                st = os.stat(entry_path)
+                live.append((st.st_mtime, st.st_size, entry_path))
+
+        total = sum(size for _, size, _ in live)
+        for _, size, entry_path in sorted(live):
+            if total <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            total -= size
+            evicted += 1
+
+        if evicted:
+            logger.debug(f"Evicted {evicted} parse cache entries from {self.cache_dir}")
+        return evicted
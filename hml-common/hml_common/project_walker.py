@@ -0,0 +1,194 @@
+import os
+import re
+import fnmatch
+import itertools
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Dependencies and hidden files and directories: .git, CI configs, .hasura and connector artifacts
+DEFAULT_EXCLUDE = ('node_modules', '.*')
+# Threads reading files; reads release the GIL, so this overlaps I/O even on one CPU
+DEFAULT_READ_THREADS = 8
+# Files read per thread task; one task per file costs more than reading a small file from the page cache
+READ_BATCH_SIZE = 64
+
+def _translate_gitignore_glob(pattern: str) -> str:
+    # gitignore glob -> regex: `*` and `?` stay within one path segment, `**` spans segments
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+        elif pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+        elif pattern[i] == '*':
+            regex.append('[^/]*')
+            i += 1
+        elif pattern[i] == '?':
+            regex.append('[^/]')
+            i += 1
+        elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+            end = pattern.index(']', i + 2)
+            body = pattern[i + 1:end]
+            regex.append('[' + ('^' + body[1:] if body.startswith('!') else body).replace('\\', '\\\\') + ']')
+            i = end + 1
+        elif pattern[i] == '\\' and i + 1 < len(pattern):
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    return ''.join(regex)
+
+class GitignoreRules:
+    """
+    The rules of one .gitignore file. Paths are matched relative to the directory holding it; within the
+    file the last matching rule wins, and `!` rules re-include what earlier rules excluded.
+    """
+
+    def __init__(self, lines: Iterable[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            directory_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A pattern with a slash is anchored to the .gitignore's directory, otherwise it matches at any depth
+            prefix = '' if '/' in line else '(?:.*/)?'
+            self.rules.append((re.compile(prefix + _translate_gitignore_glob(line.lstrip('/')) + r'\Z'), negated, directory_only))
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional['GitignoreRules']:
+        try:
+            with open(file_path, 'r', errors='replace') as f:
+                rules = cls(f)
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, relative_path: str, is_dir: bool) -> Optional[bool]:
+        # True if ignored, False if re-included, None if no rule applies
+        verdict = None
+        for pattern, negated, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if pattern.match(relative_path):
+                verdict = not negated
+        return verdict
+
+class ProjectWalker:
+    """
+    Lists the files of a project with os.scandir, pruning excluded and git-ignored directories before
+    descending into them.
+
+    include and exclude are fnmatch patterns. A pattern without a slash is matched against the name of the
+    file or directory, one with a slash against its path relative to the walked root (where `*` also matches
+    slashes). Directories are only tested against exclude; files must match an include pattern and no
+    exclude pattern. With use_gitignore, the .gitignore files found on the way are honoured as git does.
+    """
+
+    def __init__(self, include: Sequence[str], exclude: Sequence[str] = DEFAULT_EXCLUDE, use_gitignore: bool = True, sort: bool = False):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.use_gitignore = use_gitignore
+        self.sort = sort
+        self._include = self._compile(self.include)
+        self._exclude = self._compile(self.exclude)
+
+    @staticmethod
+    def _compile(patterns: Sequence[str]) -> Tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+        # One regex for the patterns matched against names and one for those matched against relative paths
+        def combined(group):
+            return re.compile('|'.join(fnmatch.translate(pattern) for pattern in group)) if group else None
+        return combined([pattern for pattern in patterns if '/' not in pattern]), combined([pattern for pattern in patterns if '/' in pattern])
+
+    def _matches(self, patterns: Tuple[Optional[re.Pattern], Optional[re.Pattern]], name: str, relative_path: str) -> bool:
+        name_pattern, path_pattern = patterns
+        return bool(name_pattern and name_pattern.match(name) or path_pattern and path_pattern.match(relative_path))
+
+    def _ignored(self, gitignores: List[Tuple[str, GitignoreRules]], relative_path: str, is_dir: bool) -> bool:
+        # Deeper .gitignore files take precedence over the ones above them
+        for base, rules in reversed(gitignores):
+            verdict = rules.match(relative_path[len(base):], is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def walk(self, root: str) -> Iterator[str]:
+        """
+        Yield the paths of the included files under root, joined onto root as given, in the same
+        depth-first order as os.walk: a directory's files before the contents of its subdirectories.
+        """
+        # (directory path, path relative to root with a trailing slash or '', .gitignore rules in effect)
+        stack = [(root, '', [])]
+        while stack:
+            directory, relative_directory, gitignores = stack.pop()
+            if self.use_gitignore:
+                rules = GitignoreRules.load(os.path.join(directory, '.gitignore'))
+                if rules:
+                    gitignores = gitignores + [(relative_directory, rules)]
+            try:
+                with os.scandir(directory) as entries:
+                    entries = list(entries)
+            except OSError:
+                continue
+            if self.sort:
+                entries.sort(key=lambda entry: entry.name)
+
+            subdirectories = []
+            for entry in entries:
+                relative_path = relative_directory + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+                if self._matches(self._exclude, entry.name, relative_path):
+                    continue
+                if gitignores and self._ignored(gitignores, relative_path, is_dir):
+                    continue
+                if is_dir:
+                    if not entry.is_symlink():  # Like os.walk, do not follow directory symlinks
+                        subdirectories.append((os.path.join(directory, entry.name), relative_path + '/', gitignores))
+                elif self._matches(self._include, entry.name, relative_path):
+                    yield os.path.join(directory, entry.name)
+            stack.extend(reversed(subdirectories))
+
+def _read_text_file(file_path: str) -> Tuple[str, Optional[str], int, Optional[str]]:
+    try:
+        with open(file_path, 'r') as f:
+            return file_path, f.read(), os.fstat(f.fileno()).st_size, None
+    except Exception as e:
+        return file_path, None, 0, str(e)
+
+def _read_text_batch(file_paths: List[str]) -> List[Tuple[str, Optional[str], int, Optional[str]]]:
+    return [_read_text_file(file_path) for file_path in file_paths]
+
+def read_text_files(file_paths: Iterable[str], threads: int = DEFAULT_READ_THREADS) -> Iterator[Tuple[str, Optional[str], int, Optional[str]]]:
+    """
+    Read files concurrently and yield (path, content, size in bytes, error) in the order of file_paths;
+    content is None and error set when a file cannot be read.
+    """
+    if threads <= 1:
+        yield from map(_read_text_file, file_paths)
+        return
+    file_paths = iter(file_paths)
+    batches = iter(lambda: list(itertools.islice(file_paths, READ_BATCH_SIZE)), [])
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for batch in executor.map(_read_text_batch, batches):
+            yield from batch
+
+def split_patterns(values: Optional[List[str]]) -> List[str]:
+    # Patterns from repeatable, comma-separated command line options
+    return [pattern.strip() for value in values or [] for pattern in value.split(',') if pattern.strip()]